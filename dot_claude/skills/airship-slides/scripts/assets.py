@@ -0,0 +1,189 @@
+"""
+Concurrent prefetch and in-memory cache for the icons and images slides use.
+
+AssetCache.prefetch() stats and reads a batch of files on a thread pool, so
+decks that pull hundreds of pictures from network mounts or cold storage
+wait on all of them at once instead of one slide at a time. Each file is
+kept as a python-pptx Image (blob plus SHA-1, hashed once) keyed by
+(path, mtime, size): a changed file is read again, an unchanged one never
+is, which also carries over between decks in --batch, --serve and --watch.
+
+insert_picture() fills a picture placeholder from such an Image. It finds
+an existing identical picture through a per-package SHA-1 index instead of
+python-pptx's scan of every relationship in the package, which is
+quadratic in the number of pictures.
+
+memory_assets() lets library callers supply pictures as bytes: within the
+block, names found in the mapping resolve to those bytes instead of files.
+"""
+
+import collections
+import contextlib
+import contextvars
+import functools
+import hashlib
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml.shapes.picture import CT_Picture
+from pptx.parts.image import Image, ImagePart
+
+DEFAULT_BUDGET = 512 * 2**20
+
+
+class AssetCache:
+    """Thread-safe store of loaded pictures, bounded by `budget` bytes (LRU)."""
+
+    def __init__(self, budget=DEFAULT_BUDGET, workers=None):
+        self.budget = budget
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        self._images = collections.OrderedDict()  # (path, mtime_ns, size) -> Image
+        self._size = 0
+        self._pending = {}  # path -> Future of a load still in flight
+        self._lock = threading.Lock()
+        self._pool = None
+        self.reads = 0
+
+    def prefetch(self, paths):
+        """Start loading `paths` in the background; returns immediately.
+
+        Every call re-stats its paths, so files edited since an earlier
+        prefetch are picked up; unchanged files are not read again.
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers,
+                                                thread_name_prefix="asset-prefetch")
+            submitted = []
+            for path in dict.fromkeys(paths):
+                future = self._pool.submit(self._load, path)
+                self._pending[path] = future
+                submitted.append((path, future))
+        # Outside the lock: a callback on a finished future runs right here.
+        for path, future in submitted:
+            future.add_done_callback(functools.partial(self._landed, path))
+
+    def _landed(self, path, future):
+        # The Image is in _images now (subject to the budget); holding on to
+        # the finished Future would keep its blob alive past any eviction.
+        with self._lock:
+            if self._pending.get(path) is future:
+                del self._pending[path]
+
+    def get(self, path):
+        """The Image for `path`, or None if the file does not exist."""
+        memory = _memory.get()
+        if memory and path in memory:
+            return memory[path]
+        future = self._pending.get(path)
+        return future.result() if future is not None else self._load(path)
+
+    def sha1(self, path):
+        """Hex SHA-1 of the file at `path`, or None if it does not exist."""
+        image = self.get(path)
+        return image.sha1 if image is not None else None
+
+    def _load(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = (path, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                return image
+        with open(path, "rb") as f:
+            blob = f.read()
+        image = Image.from_blob(blob, os.path.basename(path))
+        image.sha1  # hash here, on the pool thread
+        with self._lock:
+            self.reads += 1
+            if key not in self._images:
+                self._images[key] = image
+                self._size += len(blob)
+                while self._size > self.budget and len(self._images) > 1:
+                    _, evicted = self._images.popitem(last=False)
+                    self._size -= len(evicted.blob)
+        return image
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+
+# {name: Image} supplied by memory_assets() for the current thread/task.
+_memory = contextvars.ContextVar("memory_assets", default=None)
+
+
+@contextlib.contextmanager
+def memory_assets(blobs):
+    """Resolve the names in `blobs` ({name: bytes}) to those bytes in this block."""
+    images = {name: Image.from_blob(blob, os.path.basename(name))
+              for name, blob in (blobs or {}).items()}
+    token = _memory.set(images)
+    try:
+        yield
+    finally:
+        _memory.reset(token)
+
+
+_shared = None
+
+
+def shared_cache():
+    """The process-wide AssetCache used by generate.py."""
+    global _shared
+    if _shared is None:
+        _shared = AssetCache()
+    return _shared
+
+
+def _forget_shared():
+    # A forked -j worker inherits the cache but not its pool threads.
+    global _shared
+    _shared = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_shared)
+
+
+# package -> {sha1: ImagePart}, built on first use from the parts already there.
+_image_indexes = weakref.WeakKeyDictionary()
+_image_indexes_lock = threading.Lock()
+
+
+def _image_index(package):
+    with _image_indexes_lock:
+        index = _image_indexes.get(package)
+        if index is None:
+            index = _image_indexes[package] = {}
+            for part in package.iter_parts():
+                if isinstance(part, ImagePart):
+                    index.setdefault(hashlib.sha1(part.blob).hexdigest(), part)
+        return index
+
+
+def insert_picture(ph, image):
+    """PicturePlaceholder.insert_picture() for an in-memory Image.
+
+    Produces the same XML and parts as python-pptx; only the lookup of an
+    identical, already-inserted picture is done through the SHA-1 index.
+    """
+    slide_part = ph.part
+    package = slide_part.package
+    index = _image_index(package)
+    image_part = index.get(image.sha1)
+    if image_part is None:
+        image_part = index[image.sha1] = ImagePart.new(package, image)
+    rId = slide_part.relate_to(image_part, RT.IMAGE)
+    pic = CT_Picture.new_ph_pic(ph.shape_id, ph.name, image_part.desc, rId)
+    pic.crop_to_fit(image_part._px_size, (ph.width, ph.height))
+    ph._replace_placeholder_with(pic)
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Benchmark generate.py across deck sizes and every layout.
+
+Usage:
+    python3 bench.py [--sizes 10,100,1000,5000] [--out results.json]
+    python3 bench.py --baseline baseline.json [--threshold 0.25]
+    python3 bench.py --out baseline.json          # record a new baseline
+
+Each case (deck size x with/without icons and images) runs in a fresh
+process so import time and peak RSS are its own. Decks are synthesized from
+FILL_SPECS, cycling through every LAYOUT_MAP entry, and each case reports:
+
+    phases    import, template_open, clear_slides, load_template, render, save
+    layouts   add_slide() time per layout (count, total, mean)
+    rss_kb    peak resident set size of the case process
+
+With --baseline, any phase that is more than --threshold slower than in the
+baseline (and by more than --min-delta seconds, to ignore timer noise) is
+reported and the exit status is 1.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SIZES = (10, 100, 1000, 5000)
+
+
+def _write_png(path, width, height, seed):
+    """Write an opaque RGB PNG with a simple gradient (no Pillow needed)."""
+    rows = bytearray()
+    for y in range(height):
+        rows.append(0)
+        for x in range(width):
+            rows += bytes(((x + seed) % 256, (y * 3 + seed) % 256, (x ^ y) % 256))
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(bytes(rows), 6)))
+        f.write(chunk(b"IEND", b""))
+
+
+def make_assets(directory):
+    """Write a few icons and photos to `directory`; returns {"icon": [...], "image": [...]}."""
+    assets = {"icon": [], "image": []}
+    for i in range(3):
+        icon = os.path.join(directory, f"icon{i}.png")
+        _write_png(icon, 128, 128, i * 40)
+        assets["icon"].append(icon)
+        image = os.path.join(directory, f"photo{i}.png")
+        _write_png(image, 1200, 800, i * 70)
+        assets["image"].append(image)
+    return assets
+
+
+def _set_path(data, path, value):
+    """Set a dotted FILL_SPECS path ("columns.1.body") in nested dicts/lists."""
+    *parents, leaf = path.split(".")
+    node = data
+    for key, next_key in zip(parents, parents[1:] + [leaf]):
+        default = [] if next_key.isdigit() else {}
+        if isinstance(node, list):
+            key = int(key)
+            while len(node) <= key:
+                node.append(default.copy())
+            node = node[key]
+        else:
+            node = node.setdefault(key, default)
+    if isinstance(node, list):
+        leaf = int(leaf)
+        while len(node) <= leaf:
+            node.append(None)
+    node[leaf] = value
+
+
+def synth_slides(count, assets=None):
+    """`count` slides cycling through every layout, with every field filled.
+
+    With `assets`, picture fields point at those files; without, they are
+    left out so only text fills are measured.
+    """
+    from generate import FILL_SPECS, LAYOUT_MAP, PICTURE_FIELDS
+
+    layouts = list(LAYOUT_MAP)
+    slides = []
+    for i in range(count):
+        layout = layouts[i % len(layouts)]
+        slide = {"layout": layout, "title": f"{layout} slide {i}"}
+        for path, _ in FILL_SPECS[layout]:
+            path = path.rstrip("?")
+            field = path.rsplit(".", 1)[-1]
+            if field in PICTURE_FIELDS:
+                if assets:
+                    _set_path(slide, path, assets[field][i % len(assets[field])])
+            elif path != "title":
+                _set_path(slide, path, f"{field} text for slide {i}. " * 3)
+        slides.append(slide)
+    return slides
+
+
+def _peak_rss_kb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def run_case(size, with_assets, template_path, assets_dir):
+    """Time one deck in this process; returns the case result dict."""
+    phases = {}
+
+    t = time.perf_counter()
+    sys.path.insert(0, SCRIPTS_DIR)
+    import generate
+    pptx = generate._pptx()
+    phases["import"] = time.perf_counter() - t
+
+    template_path = template_path or generate.default_template_path()
+    assets = make_assets(assets_dir) if with_assets else None
+    slides = synth_slides(size, assets)
+
+    t = time.perf_counter()
+    prs = pptx.Presentation(template_path)
+    phases["template_open"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    generate.clear_slides(prs)
+    phases["clear_slides"] = time.perf_counter() - t
+
+    # The full load the CLI does: open, clear, snapshot and fill plan.
+    t = time.perf_counter()
+    template = generate.load_template(template_path)
+    prs = template.new_presentation()
+    phases["load_template"] = time.perf_counter() - t
+
+    layouts = {}
+    t = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for slide_data in slides:
+            start = time.perf_counter()
+            generate.add_slide(prs, slide_data, template.plan)
+            stats = layouts.setdefault(slide_data["layout"], {"count": 0, "total": 0.0})
+            stats["count"] += 1
+            stats["total"] += time.perf_counter() - start
+    phases["render"] = time.perf_counter() - t
+    for stats in layouts.values():
+        stats["mean"] = stats["total"] / stats["count"]
+
+    output = os.path.join(assets_dir, "bench.pptx")
+    t = time.perf_counter()
+    generate.save_presentation(prs, output)
+    phases["save"] = time.perf_counter() - t
+
+    return {"name": case_name(size, with_assets), "slides": size, "assets": with_assets,
+            "phases": phases, "layouts": layouts, "rss_kb": _peak_rss_kb(),
+            "output_bytes": os.path.getsize(output)}
+
+
+def case_name(size, with_assets):
+    return f"{size}{'+assets' if with_assets else ''}"
+
+
+def run_isolated(size, with_assets, template_path):
+    """Run one case in a child process and return its result."""
+    with tempfile.TemporaryDirectory(prefix="airship-bench-") as tmp:
+        cmd = [sys.executable, os.path.abspath(__file__), "--case", str(size),
+               "--assets-dir", tmp]
+        if with_assets:
+            cmd.append("--with-assets")
+        if template_path:
+            cmd += ["--template", template_path]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"case {case_name(size, with_assets)} failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def environment():
+    import importlib.metadata as metadata
+    try:
+        pptx_version = metadata.version("python-pptx")
+    except metadata.PackageNotFoundError:
+        pptx_version = None
+    return {"python": platform.python_version(), "python_pptx": pptx_version,
+            "platform": platform.platform(), "cpus": os.cpu_count(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def compare(results, baseline, threshold, min_delta):
+    """Return a list of regression messages (empty if none)."""
+    base_cases = {case["name"]: case for case in baseline.get("cases", [])}
+    regressions = []
+    for case in results["cases"]:
+        base = base_cases.get(case["name"])
+        if base is None:
+            continue
+        for phase, value in case["phases"].items():
+            old = base["phases"].get(phase)
+            if old is None:
+                continue
+            if value > old * (1 + threshold) and value - old > min_delta:
+                regressions.append(f"{case['name']} {phase}: {old:.3f}s -> {value:.3f}s "
+                                   f"(+{(value / old - 1) * 100 if old else float('inf'):.0f}%)")
+    return regressions
+
+
+def print_summary(results):
+    phases = list(results["cases"][0]["phases"]) if results["cases"] else []
+    print(f"{'case':<14}" + "".join(f"{p:>15}" for p in phases) + f"{'rss MB':>10}")
+    for case in results["cases"]:
+        print(f"{case['name']:<14}"
+              + "".join(f"{case['phases'][p]:>14.3f}s" for p in phases)
+              + f"{case['rss_kb'] / 1024:>10.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Airship slide generator.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated deck sizes (default: %(default)s)")
+    parser.add_argument("--template", help="template PPTX (default: bundled Airship master)")
+    parser.add_argument("--out", metavar="FILE", help="write results JSON to FILE")
+    parser.add_argument("--baseline", metavar="FILE", help="compare against a stored results JSON")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown per phase as a fraction (default: %(default)s)")
+    parser.add_argument("--min-delta", type=float, default=0.05, metavar="SECONDS",
+                        help="ignore slowdowns smaller than this (default: %(default)s)")
+    parser.add_argument("--no-assets", action="store_true", help="skip the icons/images cases")
+    # Internal: run a single case in this process.
+    parser.add_argument("--case", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--with-assets", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--assets-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case is not None:
+        result = run_case(args.case, args.with_assets, args.template, args.assets_dir)
+        print(json.dumps(result))
+        return
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    results = {"environment": environment(), "cases": []}
+    for size in sizes:
+        for with_assets in ((False,) if args.no_assets else (False, True)):
+            print(f"  {case_name(size, with_assets)}...", file=sys.stderr, flush=True)
+            results["cases"].append(run_isolated(size, with_assets, args.template))
+
+    print_summary(results)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_delta)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regressions over {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"\n✅ No regressions over {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+"""
+Native, editable PowerPoint charts from slide JSON.
+
+A slide's "chart" field describes the data, given inline or read from a
+CSV or NPY file:
+
+    {"type": "line", "categories": ["Q1", "Q2"], "series": [{"name": "ARR", "values": [1, 2]}]}
+    {"type": "line", "csv": "metrics.csv", "x": "time", "y": ["p50", "p95"]}
+    {"type": "scatter", "npy": "latency.npy", "columns": ["t", "ms"], "x": "t"}
+
+Types are line, column, bar, area, scatter and pie. For CSV the first
+column is the x axis unless "x" names another, and every other column is a
+series unless "y" lists them. An NPY file holds a 1-D array (one series)
+or a 2-D array of columns named by "columns".
+
+Series longer than "max_points" (default MAX_POINTS) are downsampled with
+NumPy before they reach python-pptx, so a million-row export becomes a
+chart of a few thousand points: "lttb" (Largest-Triangle-Three-Buckets,
+the default) keeps the visual shape of a line, "minmax" keeps every spike
+by taking the lowest and highest point per bucket. Loaded and downsampled
+data is memoized per file (path, mtime, size), so --watch and --serve only
+re-read a source that changed.
+
+Requires NumPy for CSV/NPY sources and downsampling (pip3 install numpy).
+"""
+
+import csv
+import functools
+import hashlib
+import json
+import math
+import os
+
+MAX_POINTS = 2000
+
+# Chart type -> XL_CHART_TYPE member. python-pptx is imported only to render,
+# so validating a spec (generate.py --check) stays cheap.
+CHART_TYPES = {
+    "line": "LINE",
+    "column": "COLUMN_CLUSTERED",
+    "bar": "BAR_CLUSTERED",
+    "area": "AREA",
+    "scatter": "XY_SCATTER_LINES_NO_MARKERS",
+    "pie": "PIE",
+}
+
+DOWNSAMPLERS = ("lttb", "minmax", "none")
+
+# Data visualization sequence from references/branding.md.
+SERIES_COLORS = ("1E90FF", "3CDBC0", "D2F34C", "7CB8E4", "B8D4F0", "C8CAD0", "D6D8E0", "5A5E6E")
+
+SPEC_FIELDS = ("type", "categories", "series", "csv", "npy", "x", "y", "columns",
+               "max_points", "downsample", "box", "legend", "number_format")
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("NumPy is required for CSV/NPY chart data and downsampling "
+                          "(pip3 install numpy)") from e
+    return numpy
+
+
+# -- Downsampling ------------------------------------------------------------
+
+def lttb(x, y, n_out):
+    """Indices of the `n_out` points Largest-Triangle-Three-Buckets keeps.
+
+    Each bucket keeps the point forming the largest triangle with the point
+    kept in the previous bucket and the mean of the next one. Bucket means
+    are computed for all buckets at once; the per-bucket choice depends on
+    the previous one, so only that walk is a Python loop (one step per
+    output point, each vectorized over its bucket).
+    """
+    np = _numpy()
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # n_out - 2 buckets between the fixed first and last points.
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    mean_x = np.append(mean_x[1:], x[-1])
+    mean_y = np.append(mean_y[1:], y[-1])
+
+    keep = np.empty(n_out, dtype=np.intp)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - mean_x[i]) * (y[lo:hi] - y[a])
+                      - (x[a] - x[lo:hi]) * (mean_y[i] - y[a]))
+        a = lo + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        keep[i + 1] = a
+    return keep
+
+
+def minmax(y, n_out):
+    """Indices of the lowest and highest point in each of `n_out` // 2 buckets.
+
+    Fully vectorized: the series is padded into a (buckets, size) matrix and
+    reduced along rows. Keeps the first and last point too.
+    """
+    np = _numpy()
+    n = len(y)
+    buckets = max(1, (n_out - 2) // 2)
+    if n_out >= n or n <= 2 * buckets:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    size = math.ceil(n / buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    rows = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    lows = offsets + np.argmin(np.where(np.isnan(rows), np.inf, rows), axis=1)
+    highs = offsets + np.argmax(np.where(np.isnan(rows), -np.inf, rows), axis=1)
+    keep = np.concatenate(([0, n - 1], lows[lows < n], highs[highs < n]))
+    return np.unique(keep)
+
+
+def downsample_indices(x, columns, max_points, method="lttb"):
+    """Indices to keep so all `columns` together stay within `max_points`.
+
+    Series share their x values, so each gets an equal share of the budget
+    and the union of the points they keep is used for all of them.
+    """
+    np = _numpy()
+    n = len(columns[0]) if columns else 0
+    if method == "none" or n <= max_points:
+        return None
+    share = max(3, max_points // len(columns))
+    if x is None or x.dtype.kind not in "iuf":
+        x = np.arange(n, dtype=float)
+    keep = [lttb(x, y, share) if method == "lttb" else minmax(y, share) for y in columns]
+    return np.unique(np.concatenate(keep))
+
+
+# -- Loading -----------------------------------------------------------------
+
+def source_path(spec):
+    """The CSV or NPY file a chart spec reads, or None for inline data."""
+    if isinstance(spec, dict):
+        return spec.get("csv") or spec.get("npy") or None
+    return None
+
+
+@functools.lru_cache(maxsize=256)
+def _fingerprint(path, mtime_ns, size):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def fingerprint(path):
+    """SHA-1 of a data file, recomputed only when its stat() changes."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return _fingerprint(path, st.st_mtime_ns, st.st_size)
+
+
+def _pick_columns(path, names, x_key, y_keys, default_x):
+    def index(key):
+        if isinstance(key, int) and 0 <= key < len(names):
+            return key
+        if key in names:
+            return names.index(key)
+        raise ValueError(f"{path}: no column {key!r} (columns: {', '.join(names)})")
+
+    x_index = index(x_key) if x_key is not None else (0 if default_x else None)
+    if y_keys is None:
+        y_indexes = [i for i in range(len(names)) if i != x_index]
+    else:
+        y_indexes = [index(key) for key in ([y_keys] if isinstance(y_keys, (str, int))
+                                            else y_keys)]
+    return x_index, y_indexes
+
+
+def _read_csv(np, path, spec):
+    """Read only the columns the chart uses, as floats where possible."""
+    with open(path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f), None)
+    if not header:
+        raise ValueError(f"{path}: empty CSV")
+    names = [name.strip() for name in header]
+    x_index, y_indexes = _pick_columns(path, names, spec.get("x"), spec.get("y"), True)
+
+    def load(usecols, dtype=float):
+        table = np.loadtxt(path, dtype=dtype, delimiter=",", skiprows=1, quotechar='"',
+                           usecols=usecols, ndmin=2, encoding="utf-8")
+        return {i: table[:, j] for j, i in enumerate(usecols)}
+
+    used = sorted({x_index, *y_indexes} - {None})
+    try:
+        columns = load(used)
+    except ValueError:
+        # A text x axis (dates, labels): parsed on its own, the series as numbers.
+        columns = {**load([x_index], str), **load(y_indexes)}
+    return names, x_index, y_indexes, columns
+
+
+def _read_npy(np, path, spec):
+    data = np.load(path, allow_pickle=False)
+    if data.ndim == 1:
+        data = data[:, None]
+    if data.ndim != 2:
+        raise ValueError(f"{path}: expected a 1-D or 2-D array, got {data.ndim}-D")
+    names = list(spec.get("columns") or [])
+    names += [f"series {i + 1}" for i in range(len(names), data.shape[1])]
+    x_index, y_indexes = _pick_columns(path, names, spec.get("x"), spec.get("y"), False)
+    return names, x_index, y_indexes, {i: data[:, i] for i in range(data.shape[1])}
+
+
+@functools.lru_cache(maxsize=32)
+def _load_file(path, mtime_ns, size, spec_json):
+    np = _numpy()
+    spec = json.loads(spec_json)
+    read = _read_csv if spec.get("csv") else _read_npy
+    names, x_index, y_indexes, columns = read(np, path, spec)
+    x = columns[x_index] if x_index is not None else None
+    ys = [columns[i].astype(float) for i in y_indexes]
+    keep = downsample_indices(x, ys, spec.get("max_points") or MAX_POINTS,
+                              spec.get("downsample", "lttb"))
+    if keep is not None:
+        x = x[keep] if x is not None else keep
+        ys = [y[keep] for y in ys]
+    elif x is None:
+        x = np.arange(len(ys[0]) if ys else 0)
+    if x.dtype.kind == "f" and np.all(np.isfinite(x)) and np.all(x == np.round(x)):
+        x = x.astype(np.int64)  # whole-number x read as float, e.g. from CSV
+    return _plain(x), [(names[i], _plain(y)) for i, y in zip(y_indexes, ys)]
+
+
+def _plain(values):
+    """A NumPy column as a list of Python values, NaN as None (a gap)."""
+    values = values.tolist()
+    return [None if isinstance(v, float) and math.isnan(v) else v for v in values]
+
+
+def load_series(spec):
+    """Resolve a chart spec to (categories, [(name, values), ...]), downsampled."""
+    path = source_path(spec)
+    if path:
+        st = os.stat(path)
+        options = {key: spec.get(key) for key in ("csv", "npy", "x", "y", "columns",
+                                                  "max_points", "downsample")}
+        return _load_file(path, st.st_mtime_ns, st.st_size, json.dumps(options, sort_keys=True))
+
+    series = [(s.get("name") or f"series {i + 1}", list(s.get("values") or []))
+              for i, s in enumerate(spec.get("series") or [])]
+    length = max((len(values) for _, values in series), default=0)
+    categories = list(spec.get("categories") or range(1, length + 1))
+    max_points = spec.get("max_points") or MAX_POINTS
+    if length > max_points and spec.get("downsample", "lttb") != "none":
+        np = _numpy()
+        x = np.asarray(categories)
+        columns = [np.asarray([math.nan if v is None else v for v in values], dtype=float)
+                   for _, values in series]
+        keep = downsample_indices(x, columns, max_points, spec.get("downsample", "lttb"))
+        categories = _plain(x[keep])
+        series = [(name, _plain(column[keep])) for (name, _), column in zip(series, columns)]
+    return categories, series
+
+
+# -- Validation --------------------------------------------------------------
+
+def check_spec(spec, where, asset_exists=os.path.exists):
+    """Errors in a chart spec, each prefixed with `where`."""
+    if not isinstance(spec, dict):
+        return [f"{where}: expected an object, got {type(spec).__name__}"]
+    errors = []
+    for key in spec:
+        if key not in SPEC_FIELDS:
+            errors.append(f"{where}: unknown field '{key}' (allowed: {', '.join(SPEC_FIELDS)})")
+    chart_type = spec.get("type", "line")
+    if chart_type not in CHART_TYPES:
+        errors.append(f"{where}.type: unknown chart type '{chart_type}' "
+                      f"(one of: {', '.join(CHART_TYPES)})")
+    if spec.get("downsample", "lttb") not in DOWNSAMPLERS:
+        errors.append(f"{where}.downsample: one of {', '.join(DOWNSAMPLERS)}")
+    max_points = spec.get("max_points", MAX_POINTS)
+    if not isinstance(max_points, int) or max_points < 3:
+        errors.append(f"{where}.max_points: expected an integer >= 3")
+    box = spec.get("box")
+    if box is not None and (not isinstance(box, list) or len(box) != 4
+                            or not all(isinstance(v, (int, float)) for v in box)):
+        errors.append(f"{where}.box: expected [left, top, width, height] in inches")
+
+    sources = [key for key in ("csv", "npy", "series") if spec.get(key)]
+    if len(sources) != 1:
+        errors.append(f"{where}: give exactly one of csv, npy or series")
+    path = source_path(spec)
+    if path is not None:
+        if not isinstance(path, str):
+            errors.append(f"{where}: expected a file path, got {type(path).__name__}")
+        elif not asset_exists(path):
+            errors.append(f"{where}: file not found: {path}")
+    elif isinstance(spec.get("series"), list):
+        for i, series in enumerate(spec["series"]):
+            values = series.get("values") if isinstance(series, dict) else None
+            if not isinstance(values, list) or not all(
+                    v is None or isinstance(v, (int, float)) for v in values):
+                errors.append(f"{where}.series.{i}: expected {{\"name\": ..., \"values\": "
+                              "[numbers]}")
+    elif "series" in spec:
+        errors.append(f"{where}.series: expected a list")
+    return errors
+
+
+# -- Rendering ---------------------------------------------------------------
+
+def _chart_data(chart_type, categories, series, number_format):
+    from pptx.chart.data import CategoryChartData, XyChartData
+
+    if chart_type == "scatter":
+        data = XyChartData(number_format=number_format)
+        for name, values in series:
+            points = data.add_series(name)
+            for x, y in zip(categories, values):
+                if y is not None:
+                    points.add_data_point(x, y)
+        return data
+    data = CategoryChartData(number_format=number_format)
+    data.categories = categories
+    for name, values in series:
+        data.add_series(name, values)
+    return data
+
+
+def add_chart(slide, spec, area):
+    """Draw the chart `spec` describes on `slide`; returns the GraphicFrame.
+
+    `area` is the default (left, top, width, height) in inches, which the
+    spec's "box" overrides.
+    """
+    from pptx.dml.color import RGBColor
+    from pptx.enum.chart import XL_CHART_TYPE, XL_LEGEND_POSITION
+    from pptx.util import Inches, Pt
+
+    chart_type = spec.get("type", "line")
+    categories, series = load_series(spec)
+    data = _chart_data(chart_type, categories, series, spec.get("number_format", "General"))
+    left, top, width, height = (Inches(v) for v in (spec.get("box") or area))
+    frame = slide.shapes.add_chart(getattr(XL_CHART_TYPE, CHART_TYPES[chart_type]),
+                                   left, top, width, height, data)
+
+    chart = frame.chart
+    chart.font.size = Pt(10)
+    chart.has_legend = spec.get("legend", len(series) > 1 or chart_type == "pie")
+    if chart.has_legend:
+        chart.legend.position = XL_LEGEND_POSITION.BOTTOM
+        chart.legend.include_in_layout = False
+    plot = chart.plots[0]
+    if chart_type == "pie":
+        for i, point in enumerate(plot.series[0].points):
+            point.format.fill.solid()
+            point.format.fill.fore_color.rgb = RGBColor.from_string(
+                SERIES_COLORS[i % len(SERIES_COLORS)])
+        return frame
+    for i, s in enumerate(plot.series):
+        color = RGBColor.from_string(SERIES_COLORS[i % len(SERIES_COLORS)])
+        if chart_type in ("line", "scatter"):
+            s.format.line.color.rgb = color
+            s.format.line.width = Pt(1.5)
+            s.smooth = False
+        else:
+            s.format.fill.solid()
+            s.format.fill.fore_color.rgb = color
+    return frame
@@ -3,7 +3,57 @@
 Generate branded Airship presentations using the master PPTX template.
 
 Usage:
-    python3 generate.py <input.json> <output.pptx>
+    python3 generate.py <input.json> <output.pptx> [template.pptx]
+    python3 generate.py --batch "decks/*.json" --out-dir out/
+    python3 generate.py --manifest manifest.json
+    python3 generate.py --serve [--socket PATH | --stdio]
+    producer | python3 generate.py - <output.pptx>
+    python3 generate.py <input.json> - | upload   (deck on stdout, log on stderr)
+
+Options:
+    --image-dpi DPI     downsample pictures to their placeholder size (images.py)
+    -j/--jobs N         render large decks in chunks across N processes
+    -i/--incremental    re-render only slides whose JSON or assets changed
+    -w/--watch          re-render on every change to the input, assets or template
+    --check             validate the input (fields, list sizes, image paths) and exit
+    --profile REPORT    write per-phase/per-layout timings and memory peaks as JSON
+    --prune             drop unused layouts and their media from the output
+    --fit POLICY        text that overflows its placeholder: shrink (default),
+                        split onto continuation slides, or none (textfit.py)
+    --zip-level N       deflate level for XML parts (media is stored as-is)
+
+Batch mode parses the template once and builds every deck from an in-memory
+copy of it. A manifest is {"decks": [{"input": "a.json", "output": "a.pptx"}]};
+a deck may add its own "template", and relative paths are resolved against
+the manifest's directory. Parsed templates are shared through an LRU
+TemplateRegistry, so switching masters between decks (or daemon jobs)
+parses each one once.
+
+Daemon mode keeps python-pptx and the parsed template warm and takes render
+jobs as JSON lines, one response line per job. Relative paths in a job
+(and the pictures, CSVs and chart data its slides name) are resolved
+against its "cwd", the client's working directory:
+
+    {"input": "/abs/in.json", "output": "/abs/out.pptx", "cwd": "/abs/dir"}
+    {"slides": [...]}                       -> {"ok": true, "bytes": "<base64>"}
+    {"op": "ping"} / {"op": "shutdown"}
+
+While a daemon is listening on the socket, the plain CLI hands its job to it
+instead of rendering locally (use --no-daemon to opt out).
+
+As a library, render_pptx() takes the slides dict plus {name: bytes} for the
+pictures they reference and returns the PPTX bytes, without temp files;
+AsyncRenderer runs it from asyncio on a bounded thread pool. Errors raise
+SlideGenError subclasses (InvalidInput, TemplateNotFound, ...) instead of
+exiting:
+
+    data = render_pptx({"slides": [...]}, assets={"logo.png": png_bytes})
+    async with AsyncRenderer(max_workers=4) as renderer:
+        data = await renderer.render(slides, assets=assets)
+
+Input is streamed: slides are rendered while the rest of the file is still
+being read, so a producer can pipe thousands of slides in on stdin ("-").
+Besides the document below, JSONL with one slide object per line works too.
 
 Input JSON format:
 {
@@ -83,7 +133,13 @@ Input JSON format:
             "title": "Chart Title",
             "tag": "SET TAG IN CAPS",
             "body": "Description text",
-            "callout": "Key takeaway highlight text"
+            "callout": "Key takeaway highlight text",
+            "chart": {"type": "line", "csv": "metrics.csv", "x": "time", "y": ["p95"]}
+        },
+        {
+            "layout": "blank_title",
+            "title": "Appendix: Accounts",
+            "table": {"csv": "accounts.csv", "columns": ["id", "name", "plan"]}
         },
         {
             "layout": "card_grid",
@@ -110,18 +166,62 @@ Input JSON format:
 }
 """
 
+import argparse
+import base64
+import codecs
+import collections
+import contextlib
+import csv
+import glob
+import hashlib
+import io
+import itertools
 import json
+import socket
+import socketserver
 import sys
 import os
+import pickle
+import threading
+import time
+import zipfile
 from copy import deepcopy
 from pathlib import Path
 
-try:
-    from pptx import Presentation
-    from pptx.util import Inches, Pt, Emu
-except ImportError:
-    print("Error: python-pptx is required. Install with: pip3 install python-pptx")
-    sys.exit(1)
+
+
+class SlideGenError(Exception):
+    """Base class for the errors the generator raises instead of exiting."""
+
+
+class MissingDependency(SlideGenError, ImportError):
+    """A required package (python-pptx) is not installed."""
+
+
+class TemplateNotFound(SlideGenError, FileNotFoundError):
+    """The template PPTX does not exist."""
+
+
+class InvalidInput(SlideGenError, ValueError):
+    """The slides could not be parsed or failed validation.
+
+    `errors` lists every problem found when there was more than one.
+    """
+
+    def __init__(self, message, errors=()):
+        super().__init__(message)
+        self.errors = list(errors)
+
+
+def _pptx():
+    """Import python-pptx on first use, so daemon clients never pay for it."""
+    try:
+        import pptx
+    except ImportError as e:
+        raise MissingDependency(
+            "python-pptx is required. Install with: pip3 install python-pptx") from e
+    return pptx
+
 
 # Layout name mapping: friendly name -> PPTX layout index
 LAYOUT_MAP = {
@@ -175,284 +275,1638 @@ def clear_slides(prs):
         del prs.slides._sldIdLst[0]
 
 
+# Which slide JSON field fills which placeholder idx, per layout. A field is a
+# dotted path ("columns.1.icon"); a trailing "?" fills only when the value is
+# non-empty. icon/image fields go into picture placeholders, the rest are text.
+def _grid(key, count, fields):
+    """Fill specs for `count` repeated items (columns/cards) of a grid layout."""
+    return [(f"{key}.{i}.{field}", idx_list[i])
+            for i in range(count) for field, idx_list in fields]
+
+
+_COVER = [("title", 0), ("subtitle", 1)]
+_SECTION = [("title", 0), ("label", 1)]
+_CONTENT = [("title", 0), ("body", 1), ("tag", 2), ("subtitle?", 3)]
+_TWO_COLUMN = [("title", 0), ("tag", 2), ("columns.0.body", 1), ("columns.1.body", 3)]
+
+FILL_SPECS = {
+    **{name: _COVER for name in LAYOUT_MAP if name.startswith("cover")},
+    **{name: _SECTION for name in LAYOUT_MAP if name.startswith("section")},
+    "feature_text": [("title", 0)],
+    "feature_text_2": [("title", 0)],
+    "content": _CONTENT,
+    "content_2": _CONTENT,
+    "content_3": _CONTENT,
+    "blank_title": [("title", 0)],
+    "two_column": _TWO_COLUMN,
+    "two_column_2": _TWO_COLUMN,
+    "three_column": [("title", 0), ("tag", 2), ("columns.0.body", 1),
+                     ("columns.1.body", 4), ("columns.2.body", 5)],
+    # Placeholders: 3=pic, 4=pic, 5=pic, 6=subtitle, 8=subtitle, 13=subtitle
+    # 1=body, 7=body, 9=body
+    "three_icon": [("title", 0), ("tag", 2)] + _grid("columns", 3, [
+        ("icon", [3, 4, 5]), ("subtitle", [6, 8, 13]), ("body", [1, 7, 9])]),
+    "four_icon": [("title", 0), ("tag", 2)] + _grid("columns", 4, [
+        ("icon", [3, 6, 9, 15]), ("subtitle", [4, 7, 13, 16]), ("body", [1, 5, 8, 14])]),
+    "three_image": [("title", 0), ("tag", 1)] + _grid("columns", 3, [
+        ("image", [8, 9, 13]), ("subtitle", [3, 5, 7]), ("body", [2, 4, 6])]),
+    "four_image": [("title", 0), ("tag", 1)] + _grid("columns", 4, [
+        ("image", [4, 7, 13, 16]), ("subtitle", [3, 6, 9, 15]), ("body", [2, 5, 8, 14])]),
+    # card titles: idx 0, 4, 5 / card bodies: idx 6, 7, 8
+    "card_grid": [("title", 2), ("tag", 1), ("subtitle", 3)] + _grid("cards", 3, [
+        ("title", [0, 4, 5]), ("body", [6, 7, 8])]),
+    # card: pic=2,5,8  subtitle=3,6,9  body=1,4,7
+    "cool_cards": [("title", 0), ("tag", 14), ("body", 13)] + _grid("cards", 3, [
+        ("icon", [2, 5, 8]), ("subtitle", [3, 6, 9]), ("body", [1, 4, 7])]),
+    "three_body": [],
+    "split_left": [("title", 0), ("body", 1), ("tag", 2), ("image", 4), ("icon", 3)],
+    "split_right": [("title", 0), ("body", 1), ("tag", 3), ("image", 2), ("icon", 4)],
+    "chart": [("title", 0), ("body", 1), ("tag", 2), ("callout", 3)],
+    "closing": [("title", 0)],
+}
+
+PICTURE_FIELDS = ("icon", "image")
+
+# Layouts whose "chart" field is drawn as a native chart (see charts.py), and
+# the area it fills by default as (left, top, width, height) in inches.
+CHART_AREAS = {"chart": (0.5, 1.6, 6.0, 3.6)}
+
+# Layouts whose "table" field is drawn as a table paginated over as many
+# slides as it needs (see tables.py), and the area each page fills.
+TABLE_AREAS = {"blank_title": (0.5, 1.3, 9.0, 3.9)}
+PLAN_VERSION = 3
+
+
+def cache_dir(*parts):
+    """Per-user cache directory for compiled plans and other derived data."""
+    root = os.environ.get("AIRSHIP_SLIDES_CACHE") or os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "airship-slides")
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def file_sha256(path):
+    """Hex SHA-256 of a file's contents."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _specs_fingerprint():
+    blob = json.dumps([PLAN_VERSION, LAYOUT_MAP, FILL_SPECS], sort_keys=True).encode()
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+
+def compile_plan(prs):
+    """Introspect the template's layouts into a per-layout fill plan.
+
+    Returns {layout_name: {"index": n, "fills": [[path, idx, kind, optional, box], ...],
+    "text": {idx: style}}} where only placeholders that actually exist on the
+    layout are kept, `box` is the picture placeholder's [cx, cy] in EMU (None
+    for text), and each filled text placeholder's style (box, insets, font
+    size and typeface) is what textfit.py measures against.
+    """
+    from textfit import placeholder_style, theme_fonts
+
+    PP_PLACEHOLDER = _pptx().enum.shapes.PP_PLACEHOLDER
+    layouts = prs.slide_layouts
+    fonts = theme_fonts(prs.slide_masters[0])
+    plan = {}
+    for name, layout_idx in LAYOUT_MAP.items():
+        if layout_idx >= len(layouts):
+            print(f"  Warning: Layout index {layout_idx} for '{name}' out of range, using 0")
+            layout_idx = 0
+        kinds, boxes, placeholders = {}, {}, {}
+        for ph in layouts[layout_idx].iter_cloneable_placeholders():
+            picture = ph.placeholder_format.type == PP_PLACEHOLDER.PICTURE
+            kinds[ph.placeholder_format.idx] = "picture" if picture else "text"
+            boxes[ph.placeholder_format.idx] = [ph.width, ph.height]
+            placeholders[ph.placeholder_format.idx] = ph
+        fills = []
+        for field, idx in FILL_SPECS.get(name, []):
+            optional = field.endswith("?")
+            path = [int(k) if k.isdigit() else k for k in field.rstrip("?").split(".")]
+            kind = "picture" if path[-1] in PICTURE_FIELDS else "text"
+            if idx not in kinds or (kind == "picture" and kinds[idx] != "picture"):
+                continue
+            fills.append([path, idx, kind, optional, boxes[idx] if kind == "picture" else None])
+        text = {str(idx): placeholder_style(placeholders[idx], fonts)
+                for _, idx, kind, _, _ in fills if kind == "text"}
+        plan[name] = {"index": layout_idx, "fills": fills, "text": text}
+    return plan
+
+
+def load_plan(prs, template_sha256):
+    """Return the fill plan for a template, compiling it only on a cache miss.
+
+    Plans are cached on disk under the template's content hash (plus a
+    fingerprint of LAYOUT_MAP/FILL_SPECS), so editing the master or the field
+    mapping invalidates them automatically.
+    """
+    path = os.path.join(cache_dir("plans"), f"{template_sha256[:32]}-{_specs_fingerprint()}.json")
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+    plan = compile_plan(prs)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(plan, f)
+    os.replace(tmp, path)
+    return plan
+
+
+# Keys every slide may carry besides its layout's fields ("tag" also fills
+# a missing "label"; "fit" overrides --fit for the slide).
+COMMON_FIELDS = ("layout", "title", "tag", "label", "fit")
+
+
+def layout_schema():
+    """What each layout accepts, derived from FILL_SPECS without the template.
+
+    Returns {layout: {"fields": {name: kind}, "lists": {key: {"max": n,
+    "fields": {name: kind}}}}} where kind is "text", "picture", "chart",
+    "table" or "fit".
+    """
+    schema = {}
+    for name, specs in FILL_SPECS.items():
+        fields = {field: "text" for field in COMMON_FIELDS if field != "layout"}
+        fields["fit"] = "fit"
+        lists = {}
+        for field, _ in specs:
+            path = field.rstrip("?").split(".")
+            kind = "picture" if path[-1] in PICTURE_FIELDS else "text"
+            if len(path) == 1:
+                fields[path[0]] = kind
+                continue
+            key, index, item_field = path
+            entry = lists.setdefault(key, {"max": 0, "fields": {}})
+            entry["max"] = max(entry["max"], int(index) + 1)
+            entry["fields"][item_field] = kind
+        if name in CHART_AREAS:
+            fields["chart"] = "chart"
+        if name in TABLE_AREAS:
+            fields["table"] = "table"
+        schema[name] = {"fields": fields, "lists": lists}
+    return schema
+
+
+def check_slides(slides, schema=None, asset_exists=os.path.exists):
+    """Validate slide dicts against layout_schema(); returns every error found.
+
+    `asset_exists` decides whether an icon/image, chart data or table CSV
+    reference resolves.
+    """
+    import charts
+    import tables
+    from textfit import FIT_POLICIES
+
+    schema = schema or layout_schema()
+    errors = []
+
+    def check_value(where, value, kind):
+        if kind == "fit":
+            if value not in FIT_POLICIES:
+                errors.append(f"{where}: expected one of {', '.join(FIT_POLICIES)}")
+        elif kind == "chart":
+            errors.extend(charts.check_spec(value, where, asset_exists))
+        elif kind == "table":
+            errors.extend(tables.check_spec(value, where, asset_exists))
+        elif not isinstance(value, str):
+            errors.append(f"{where}: expected a string, got {type(value).__name__}")
+        elif kind == "picture" and value and not asset_exists(value):
+            errors.append(f"{where}: file not found: {value}")
+
+    for n, slide_data in enumerate(slides, 1):
+        if not isinstance(slide_data, dict):
+            errors.append(f"slide {n}: expected an object, got {type(slide_data).__name__}")
+            continue
+        layout = slide_data.get("layout", "content")
+        where = f"slide {n} ({layout})"
+        if layout not in schema:
+            errors.append(f"{where}: unknown layout (one of: {', '.join(schema)})")
+            continue
+        fields, lists = schema[layout]["fields"], schema[layout]["lists"]
+        for key, value in slide_data.items():
+            if key == "layout":
+                continue
+            if key in fields:
+                check_value(f"{where} {key}", value, fields[key])
+            elif key in lists:
+                spec = lists[key]
+                if not isinstance(value, list):
+                    errors.append(f"{where} {key}: expected a list")
+                    continue
+                if len(value) > spec["max"]:
+                    errors.append(f"{where} {key}: {len(value)} items, layout takes at most "
+                                  f"{spec['max']}")
+                for i, item in enumerate(value):
+                    if not isinstance(item, dict):
+                        errors.append(f"{where} {key}.{i}: expected an object")
+                        continue
+                    for item_key, item_value in item.items():
+                        if item_key not in spec["fields"]:
+                            errors.append(f"{where} {key}.{i}: unknown field '{item_key}' "
+                                          f"(allowed: {', '.join(spec['fields'])})")
+                        else:
+                            check_value(f"{where} {key}.{i}.{item_key}", item_value,
+                                        spec["fields"][item_key])
+            else:
+                allowed = ", ".join([*fields, *lists])
+                errors.append(f"{where}: unknown field '{key}' (allowed: {allowed})")
+    return errors
+
+
+def check_input(input_path):
+    """Parse and validate an input file; returns (slide count, errors)."""
+    slides = []
+    try:
+        for slide_data in iter_slides(input_path):
+            slides.append(slide_data)
+    except (OSError, ValueError) as e:
+        return len(slides), [f"invalid input JSON: {e}"]
+    errors = check_slides(slides)
+    if not slides:
+        errors.append("no slides in input JSON")
+    return len(slides), errors
+
+
 def _placeholder_map(slide):
     """Build a dict mapping placeholder idx -> placeholder object."""
     return {ph.placeholder_format.idx: ph for ph in slide.placeholders}
 
 
-def set_placeholder_text(slide, idx, text):
-    """Safely set placeholder text, skipping if placeholder doesn't exist."""
+def _set_text(ph, text, size=None):
     try:
-        phs = _placeholder_map(slide)
-        if idx in phs:
-            phs[idx].text = text
-            return True
+        ph.text = text
+        if size:
+            font_size = _pptx().util.Centipoints(size)
+            for paragraph in ph.text_frame.paragraphs:
+                for run in paragraph.runs:
+                    run.font.size = font_size
+        return True
     except Exception:
-        pass
-    return False
+        return False
 
 
-def set_placeholder_image(slide, idx, image_path):
-    """Replace a picture placeholder with an image."""
+def _write_text(sp, text, size=None):
+    """_set_text() on a placeholder's <p:sp> element, without the shape objects."""
+    from pptx.oxml.ns import qn
+
+    try:
+        txBody = sp.get_or_add_txBody()
+        txBody.clear_content()
+        for line in text.split("\n"):
+            txBody.add_p().append_text(line)
+        if size:
+            for r in txBody.iter(qn("a:r")):
+                r.get_or_add_rPr().sz = size
+        return True
+    except Exception:
+        return False
+
+
+def _set_image(ph, idx, image_path):
+    from assets import insert_picture, shared_cache
+
     try:
-        phs = _placeholder_map(slide)
-        if idx in phs and os.path.exists(image_path):
-            phs[idx].insert_picture(image_path)
+        image = shared_cache().get(image_path)
+        if image is not None:
+            insert_picture(ph, image)
             return True
     except Exception as e:
         print(f"  Warning: Could not set image at placeholder {idx}: {e}")
     return False
 
 
-def add_slide(prs, slide_data):
-    """Add a slide based on the layout type and content."""
+def _add_chart(slide, spec, area):
+    from charts import add_chart
+
+    try:
+        add_chart(slide, spec, area)
+        return True
+    except Exception as e:
+        print(f"  Warning: Could not add chart: {e}")
+    return False
+
+
+def _add_table(slide, spec, area):
+    from tables import add_table, paginate
+
+    try:
+        if "widths" not in spec:
+            # Not expanded by paginate_tables(): draw the first page only.
+            spec = next(paginate({"table": spec}, area))["table"]
+        add_table(slide, spec)
+        return True
+    except Exception as e:
+        print(f"  Warning: Could not add table: {e}")
+    return False
+
+
+def set_placeholder_text(slide, idx, text):
+    """Safely set placeholder text, skipping if placeholder doesn't exist."""
+    phs = _placeholder_map(slide)
+    return idx in phs and _set_text(phs[idx], text)
+
+
+def set_placeholder_image(slide, idx, image_path):
+    """Replace a picture placeholder with an image."""
+    phs = _placeholder_map(slide)
+    return idx in phs and _set_image(phs[idx], idx, image_path)
+
+
+def _field_value(slide_data, path):
+    """Resolve a fill path against slide JSON; None if a list item is missing."""
+    value = slide_data
+    for key in path:
+        if isinstance(key, int):
+            if not isinstance(value, list) or key >= len(value):
+                return None
+            value = value[key]
+        else:
+            value = value.get(key, "") if isinstance(value, dict) else ""
+    return value
+
+
+def fill_slide(slide, fills, slide_data, images=None):
+    """Fill every planned placeholder on `slide` in a single pass.
+
+    `images` maps (path, cx, cy) to a preprocessed copy sized for that box.
+    """
+    if not fills:
+        return
+    phs = _placeholder_map(slide)
+    sizes = slide_data.get("_font_sizes") or {}
+    for path, idx, kind, optional, box in fills:
+        value = _field_value(slide_data, path)
+        if value is None or ((optional or kind == "picture") and not value):
+            continue
+        ph = phs.get(idx)
+        if ph is None:
+            continue
+        if kind == "picture":
+            if images and box:
+                value = images.get((value, *box), value)
+            _set_image(ph, idx, value)
+        else:
+            _set_text(ph, value, sizes.get(".".join(map(str, path))) if sizes else None)
+
+
+def _plan_entry(plan, slide_data, warn=True):
     layout_name = slide_data.get("layout", "content")
-    layout_idx = LAYOUT_MAP.get(layout_name)
-
-    if layout_idx is None:
-        print(f"  Warning: Unknown layout '{layout_name}', using 'content'")
-        layout_idx = LAYOUT_MAP["content"]
-
-    if layout_idx >= len(prs.slide_layouts):
-        print(f"  Warning: Layout index {layout_idx} out of range, using 0")
-        layout_idx = 0
-
-    layout = prs.slide_layouts[layout_idx]
-    slide = prs.slides.add_slide(layout)
-
-    # Common fields
-    title = slide_data.get("title", "")
-    subtitle = slide_data.get("subtitle", "")
-    tag = slide_data.get("tag", "")
-    body = slide_data.get("body", "")
-    callout = slide_data.get("callout", "")
-
-    # ---- Cover slides (layouts 0-5) ----
-    if layout_name.startswith("cover"):
-        set_placeholder_text(slide, 0, title)
-        set_placeholder_text(slide, 1, subtitle)
-
-    # ---- Section dividers (layouts 6-9) ----
-    elif layout_name.startswith("section"):
-        set_placeholder_text(slide, 0, title)
-        label = slide_data.get("label", tag)
-        set_placeholder_text(slide, 1, label)
-
-    elif layout_name.startswith("feature_text"):
-        set_placeholder_text(slide, 0, title)
-
-    # ---- Content slides ----
-    elif layout_name == "content" or layout_name.startswith("content_"):
-        set_placeholder_text(slide, 0, title)
-        set_placeholder_text(slide, 1, body)
-        set_placeholder_text(slide, 2, tag)
-        if subtitle:
-            set_placeholder_text(slide, 3, subtitle)
-
-    elif layout_name == "blank_title":
-        set_placeholder_text(slide, 0, title)
-
-    # ---- Two/Three column text ----
-    elif layout_name.startswith("two_column"):
-        set_placeholder_text(slide, 0, title)
-        set_placeholder_text(slide, 2, tag)
-        columns = slide_data.get("columns", [])
-        if len(columns) >= 1:
-            set_placeholder_text(slide, 1, columns[0].get("body", ""))
-        if len(columns) >= 2:
-            set_placeholder_text(slide, 3, columns[1].get("body", ""))
-
-    elif layout_name == "three_column":
-        set_placeholder_text(slide, 0, title)
-        set_placeholder_text(slide, 2, tag)
-        columns = slide_data.get("columns", [])
-        if len(columns) >= 1:
-            set_placeholder_text(slide, 1, columns[0].get("body", ""))
-        if len(columns) >= 2:
-            set_placeholder_text(slide, 4, columns[1].get("body", ""))
-        if len(columns) >= 3:
-            set_placeholder_text(slide, 5, columns[2].get("body", ""))
-
-    # ---- 3-icon grid (layout 17) ----
-    elif layout_name == "three_icon":
-        set_placeholder_text(slide, 0, title)
-        set_placeholder_text(slide, 2, tag)
-        columns = slide_data.get("columns", [])
-        # Placeholders: 3=pic, 4=pic, 5=pic, 6=subtitle, 8=subtitle, 13=subtitle
-        # 1=body, 7=body, 9=body
-        for i, col in enumerate(columns[:3]):
-            icon = col.get("icon", "")
-            sub = col.get("subtitle", "")
-            bod = col.get("body", "")
-            if i == 0:
-                if icon: set_placeholder_image(slide, 3, icon)
-                set_placeholder_text(slide, 6, sub)
-                set_placeholder_text(slide, 1, bod)
-            elif i == 1:
-                if icon: set_placeholder_image(slide, 4, icon)
-                set_placeholder_text(slide, 8, sub)
-                set_placeholder_text(slide, 7, bod)
-            elif i == 2:
-                if icon: set_placeholder_image(slide, 5, icon)
-                set_placeholder_text(slide, 13, sub)
-                set_placeholder_text(slide, 9, bod)
-
-    # ---- 4-icon grid (layout 22) ----
-    elif layout_name == "four_icon":
-        set_placeholder_text(slide, 0, title)
-        set_placeholder_text(slide, 2, tag)
-        columns = slide_data.get("columns", [])
-        # pic indices: 3, 6, 9, 15
-        # subtitle indices: 4, 7, 13, 16
-        # body indices: 1, 5, 8, 14
-        pic_idx = [3, 6, 9, 15]
-        sub_idx = [4, 7, 13, 16]
-        bod_idx = [1, 5, 8, 14]
-        for i, col in enumerate(columns[:4]):
-            if col.get("icon"):
-                set_placeholder_image(slide, pic_idx[i], col["icon"])
-            set_placeholder_text(slide, sub_idx[i], col.get("subtitle", ""))
-            set_placeholder_text(slide, bod_idx[i], col.get("body", ""))
-
-    # ---- 3-image grid (layout 19) ----
-    elif layout_name == "three_image":
-        set_placeholder_text(slide, 0, title)
-        set_placeholder_text(slide, 1, tag)
-        columns = slide_data.get("columns", [])
-        # pic indices: 8, 9, 13
-        # subtitle indices: 3, 5, 7
-        # body indices: 2, 4, 6
-        pic_idx = [8, 9, 13]
-        sub_idx = [3, 5, 7]
-        bod_idx = [2, 4, 6]
-        for i, col in enumerate(columns[:3]):
-            if col.get("image"):
-                set_placeholder_image(slide, pic_idx[i], col["image"])
-            set_placeholder_text(slide, sub_idx[i], col.get("subtitle", ""))
-            set_placeholder_text(slide, bod_idx[i], col.get("body", ""))
-
-    # ---- 4-image grid (layout 20) ----
-    elif layout_name == "four_image":
-        set_placeholder_text(slide, 0, title)
-        set_placeholder_text(slide, 1, tag)
-        columns = slide_data.get("columns", [])
-        pic_idx = [4, 7, 13, 16]
-        sub_idx = [3, 6, 9, 15]
-        bod_idx = [2, 5, 8, 14]
-        for i, col in enumerate(columns[:4]):
-            if col.get("image"):
-                set_placeholder_image(slide, pic_idx[i], col["image"])
-            set_placeholder_text(slide, sub_idx[i], col.get("subtitle", ""))
-            set_placeholder_text(slide, bod_idx[i], col.get("body", ""))
-
-    # ---- Card grid (layout 18) ----
-    elif layout_name == "card_grid":
-        set_placeholder_text(slide, 2, title)
-        set_placeholder_text(slide, 1, tag)
-        set_placeholder_text(slide, 3, subtitle)
-        cards = slide_data.get("cards", [])
-        # card titles: idx 0, 4, 5
-        # card bodies: idx 6, 7, 8
-        title_idx = [0, 4, 5]
-        body_idx = [6, 7, 8]
-        for i, card in enumerate(cards[:3]):
-            set_placeholder_text(slide, title_idx[i], card.get("title", ""))
-            set_placeholder_text(slide, body_idx[i], card.get("body", ""))
-
-    # ---- Cool cards (layout 21) ----
-    elif layout_name == "cool_cards":
-        set_placeholder_text(slide, 0, title)
-        set_placeholder_text(slide, 14, tag)
-        set_placeholder_text(slide, 13, body)
-        cards = slide_data.get("cards", [])
-        # card: pic=2,5,8  subtitle=3,6,9  body=1,4,7
-        pic_idx = [2, 5, 8]
-        sub_idx = [3, 6, 9]
-        bod_idx = [1, 4, 7]
-        for i, card in enumerate(cards[:3]):
-            if card.get("icon"):
-                set_placeholder_image(slide, pic_idx[i], card["icon"])
-            set_placeholder_text(slide, sub_idx[i], card.get("subtitle", ""))
-            set_placeholder_text(slide, bod_idx[i], card.get("body", ""))
-
-    # ---- Split left (layout 24): text left, image right ----
-    elif layout_name == "split_left":
-        set_placeholder_text(slide, 0, title)
-        set_placeholder_text(slide, 1, body)
-        set_placeholder_text(slide, 2, tag)
-        image = slide_data.get("image", "")
-        icon = slide_data.get("icon", "")
-        if image: set_placeholder_image(slide, 4, image)
-        if icon: set_placeholder_image(slide, 3, icon)
-
-    # ---- Split right (layout 25): image left, text right ----
-    elif layout_name == "split_right":
-        set_placeholder_text(slide, 0, title)
-        set_placeholder_text(slide, 1, body)
-        set_placeholder_text(slide, 3, tag)
-        image = slide_data.get("image", "")
-        icon = slide_data.get("icon", "")
-        if image: set_placeholder_image(slide, 2, image)
-        if icon: set_placeholder_image(slide, 4, icon)
-
-    # ---- Chart with callout (layout 26) ----
-    elif layout_name == "chart":
-        set_placeholder_text(slide, 0, title)
-        set_placeholder_text(slide, 1, body)
-        set_placeholder_text(slide, 2, tag)
-        set_placeholder_text(slide, 3, callout)
-
-    # ---- Closing (layout 27) ----
-    elif layout_name == "closing":
-        set_placeholder_text(slide, 0, title)
+    entry = plan.get(layout_name)
+    if entry is None:
+        if warn:
+            print(f"  Warning: Unknown layout '{layout_name}', using 'content'")
+        entry = plan["content"]
+    return entry
+
+
+def picture_jobs(slides, plan):
+    """Every (image_path, placeholder box) the slides will insert."""
+    jobs = []
+    for slide_data in slides:
+        for path, _, kind, _, box in _plan_entry(plan, slide_data, warn=False)["fills"]:
+            if kind == "picture":
+                value = _field_value(slide_data, path)
+                if value:
+                    jobs.append((value, tuple(box)))
+    return jobs
+
+
+# Text-only layouts rendered by clone_slide(): their slides are copied from a
+# per-layout skeleton and the text written straight into the <p:sp> nodes.
+FAST_LAYOUTS = {name for name in FILL_SPECS
+                if name.startswith(("content", "section", "feature_text", "closing"))}
+
+
+def _add_text_slide(prs, slide_data, entry):
+    from slideparts import clone_slide
+
+    slide_part, sps = clone_slide(prs, prs.slide_layouts[entry["index"]])
+    sizes = slide_data.get("_font_sizes")
+    for path, idx, kind, optional, _ in entry["fills"]:
+        value = _field_value(slide_data, path)
+        if value is None or (optional and not value):
+            continue
+        sp = sps.get(idx)
+        if sp is not None:
+            _write_text(sp, value, sizes.get(".".join(map(str, path))) if sizes else None)
+    return slide_part.slide
+
 
+def add_slide(prs, slide_data, plan, images=None):
+    """Add a slide based on the layout type and content."""
+    from slideparts import append_slide
+
+    entry = _plan_entry(plan, slide_data)
+
+    if "label" not in slide_data and "tag" in slide_data:
+        slide_data = {**slide_data, "label": slide_data["tag"]}
+
+    layout_name = slide_data.get("layout", "content")
+    if layout_name in FAST_LAYOUTS and all(kind == "text" for _, _, kind, _, _ in entry["fills"]):
+        return _add_text_slide(prs, slide_data, entry)
+    slide = append_slide(prs, prs.slide_layouts[entry["index"]])
+    fill_slide(slide, entry["fills"], slide_data, images)
+    if layout_name in CHART_AREAS and slide_data.get("chart"):
+        _add_chart(slide, slide_data["chart"], CHART_AREAS[layout_name])
+    if layout_name in TABLE_AREAS and slide_data.get("table"):
+        _add_table(slide, slide_data["table"], TABLE_AREAS[layout_name])
     return slide
 
 
-def generate(input_path, output_path, template_path=None):
-    """Generate a presentation from JSON input."""
-    # Find template
-    if template_path is None:
-        script_dir = Path(__file__).parent.parent
-        template_path = script_dir / "assets" / "template" / "airship-master.pptx"
+def default_template_path():
+    """Path of the Airship master bundled with the skill."""
+    return Path(__file__).parent.parent / "assets" / "template" / "airship-master.pptx"
+
 
+def find_template(template_path=None):
+    """`template_path`, or the bundled master; raises TemplateNotFound."""
+    if template_path is None:
+        template_path = default_template_path()
     if not os.path.exists(template_path):
-        print(f"Error: Template not found at {template_path}")
-        sys.exit(1)
+        raise TemplateNotFound(f"Template not found at {template_path}")
+    return template_path
+
+
+class Template:
+    """A parsed master: slide-free package snapshot plus its compiled fill plan."""
+
+    def __init__(self, path, sha256, snapshot, plan):
+        self.path = path
+        self.sha256 = sha256
+        self.snapshot = snapshot
+        self.plan = plan
+
+    def new_presentation(self):
+        """Open a fresh, independent Presentation from the snapshot."""
+        return _pptx().Presentation(io.BytesIO(self.snapshot))
+
+
+def load_template(template_path, sha256=None):
+    """Parse the master once into a Template.
+
+    The snapshot is re-zipped uncompressed so each deck built from it with
+    Template.new_presentation() skips both the disk read and the inflate step.
+    Pass `sha256` if the file's hash is already known.
+    """
+    prs = _pptx().Presentation(str(template_path))
+    clear_slides(prs)
+    sha256 = sha256 or file_sha256(template_path)
+    plan = load_plan(prs, sha256)
+    buf = io.BytesIO()
+    prs.save(buf)
+
+    stored = io.BytesIO()
+    with zipfile.ZipFile(buf) as src, zipfile.ZipFile(stored, "w", zipfile.ZIP_STORED) as dst:
+        for info in src.infolist():
+            dst.writestr(info.filename, src.read(info))
+    return Template(str(template_path), sha256, stored.getvalue(), plan)
+
+
+DEFAULT_TEMPLATE_BUDGET = 256 * 2**20
+
+
+class TemplateRegistry:
+    """Parsed masters, loaded on first use and kept within `budget` bytes (LRU).
+
+    Entries are keyed by absolute path and revalidated on every get(): an
+    unchanged mtime and size is a hit; otherwise the file is hashed, and it
+    is parsed again only if its SHA-256 changed (a touched or re-copied
+    master costs a hash, not a parse). A Template's size is its snapshot.
+    Thread-safe; callers can switch templates per deck for free.
+    """
+
+    def __init__(self, budget=DEFAULT_TEMPLATE_BUDGET):
+        self.budget = budget
+        self._entries = collections.OrderedDict()  # path -> (mtime_ns, size, Template)
+        self._size = 0
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def get(self, template_path=None):
+        """The Template for `template_path` (None: the bundled master).
+
+        Raises TemplateNotFound if the file does not exist.
+        """
+        path = os.path.abspath(find_template(template_path))
+        st = os.stat(path)
+        stat_key = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[:2] == stat_key:
+                self._entries.move_to_end(path)
+                return entry[2]
+        sha256 = file_sha256(path)
+        if entry is not None and entry[2].sha256 == sha256:
+            template = entry[2]
+        else:
+            template = load_template(path, sha256)
+            with self._lock:
+                self.loads += 1
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._size -= len(old[2].snapshot)
+            self._entries[path] = (*stat_key, template)
+            self._size += len(template.snapshot)
+            while self._size > self.budget and len(self._entries) > 1:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted.snapshot)
+        return template
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+def _text_reader(f, chunk_size=1 << 16):
+    """A read() for binary file `f` that returns decoded text, "" at the end.
+
+    Uses read1() where there is one, so data from a pipe is handed over as
+    soon as it arrives instead of once a full chunk has been written.
+    """
+    utf8 = codecs.getincrementaldecoder("utf-8-sig")()
+    read = getattr(f, "read1", f.read)
+
+    def read_text():
+        while True:
+            data = read(chunk_size)
+            text = utf8.decode(data, final=not data)
+            # A chunk can end inside a multi-byte character; read on.
+            if text or not data:
+                return text
+
+    return read_text
+
+
+def _stream_slides(read):
+    """Yield the slides of a {"slides": [...]} document or of JSONL as they are read.
+
+    `read` returns the next piece of text, "" at the end. The first object
+    decides the format: one with a top-level "slides" array is the document
+    and its items are streamed one by one; any other object is the first
+    slide of a JSONL (or concatenated JSON) stream. Only one slide, plus a
+    read buffer, is held in memory at a time.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def fill():
+        nonlocal buf, pos, eof
+        data = read()
+        eof = not data
+        buf, pos = buf[pos:] + data, 0
+        return not eof
+
+    def peek(required=True):
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                if required:
+                    raise ValueError("unexpected end of input JSON")
+                return None
+
+    def expect(chars):
+        nonlocal pos
+        c = peek()
+        if c not in chars:
+            raise ValueError(f"expected {' or '.join(map(repr, chars))} in input JSON, got {c!r}")
+        pos += 1
+        return c
+
+    def value():
+        nonlocal pos
+        peek()
+        while True:
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if fill():
+                    continue
+                raise
+            # A number or literal may continue in the next read ("4" of "4.5");
+            # objects, arrays and strings are complete once decoded.
+            if buf[pos] not in '{["' and not eof \
+                    and (end == len(buf) or buf[end] in "+-.eE0123456789") and fill():
+                continue
+            pos = end
+            return obj
+
+    if peek(required=False) is None:
+        return
+    # Walk the first object's members, keeping them in case it is a slide.
+    expect("{")
+    members = {}
+    if peek() != "}":
+        while True:
+            name = value()
+            expect(":")
+            if name == "slides" and peek() == "[":
+                pos += 1
+                if peek() != "]":
+                    while True:
+                        yield value()
+                        if expect(",]") == "]":
+                            break
+                else:
+                    pos += 1
+                while expect(",}") == ",":
+                    value()
+                    expect(":")
+                    value()
+                return
+            members[name] = value()
+            if expect(",}") == "}":
+                break
+    else:
+        pos += 1
+
+    # JSONL: that object was the first slide.
+    yield members
+    while peek(required=False) is not None:
+        yield value()
+
+
+def iter_slides(input_path):
+    """Yield slides from an input file ("-" for stdin) as they are parsed.
+
+    Accepts the usual {"slides": [...]} document, compact or pretty-printed,
+    or JSONL with one slide object per line; both are parsed incrementally,
+    so the first slides can be rendered before the producer has finished
+    writing the rest.
+    """
+    with contextlib.ExitStack() as stack:
+        f = sys.stdin.buffer if input_path == "-" else stack.enter_context(open(input_path, "rb"))
+        yield from _stream_slides(_text_reader(f))
+
+
+def _read_input(input_path):
+    """iter_slides(), raising InvalidInput if the input cannot be opened or read."""
+    try:
+        yield from iter_slides(input_path)
+    except OSError as e:
+        raise InvalidInput(f"Cannot read input {input_path}: {e}") from e
+
+
+def load_slides(input_path):
+    """Read the whole slide list from an input JSON/JSONL file."""
+    return list(iter_slides(input_path))
+
 
-    # Load input
-    with open(input_path, 'r') as f:
-        data = json.load(f)
+def render(prs, slides, plan, verbose=True, images=None, first=1):
+    """Add every slide in `slides` to `prs` following the template's fill plan.
 
-    slides = data.get("slides", [])
+    All pictures the slides reference are read up front, concurrently, into
+    the shared AssetCache (see assets.py).
+    """
+    from assets import shared_cache
+
+    shared_cache().prefetch(images.get((path, *box), path) if images else path
+                            for path, box in picture_jobs(slides, plan))
+    for i, slide_data in enumerate(slides, first):
+        if verbose:
+            layout_name = slide_data.get("layout", "content")
+            print(f"  Slide {i}: {layout_name} - {slide_data.get('title', '')[:50]}")
+        add_slide(prs, slide_data, plan, images)
+
+
+# Parallel rendering: each worker process holds its own copy of the template
+# and sends finished slides back as part bundles (see slideparts.py).
+_worker_template = None
+
+
+def _init_worker(template):
+    global _worker_template
+    _worker_template = template
+
+
+def _bundles_for(template, slides, images):
+    from slideparts import slide_bundle
+    prs = template.new_presentation()
+    render(prs, slides, template.plan, verbose=False, images=images)
+    return [slide_bundle(slide.part) for slide in prs.slides]
+
+
+def _render_chunk(job):
+    slides, images = job
+    with contextlib.redirect_stdout(io.StringIO()):
+        return _bundles_for(_worker_template, slides, images)
+
+
+class RenderPool:
+    """Renders slide chunks into part bundles, in worker processes when jobs > 1.
+
+    submit() always returns a Future; without workers the chunk is rendered
+    right away in this process.
+    """
+
+    def __init__(self, template, jobs=None):
+        self.template = template
+        self.jobs = jobs if jobs and jobs > 1 else None
+        self._pool = None
+
+    def submit(self, slides, images=None):
+        # Imported here so --check and daemon clients start faster.
+        from concurrent.futures import Future, ProcessPoolExecutor
+
+        if not slides or not self.jobs:
+            future = Future()
+            future.set_result(_bundles_for(self.template, slides, images) if slides else [])
+            return future
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_worker,
+                                             initargs=(self.template,))
+        return self._pool.submit(_render_chunk, (slides, images))
+
+    @property
+    def depth(self):
+        """How many chunks to keep in flight ahead of the one being merged."""
+        return self.jobs * 2 if self.jobs else 0
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+def _lookahead(items, depth):
+    """Yield from `items`, keeping up to `depth` of them already started."""
+    pending = collections.deque()
+    for item in items:
+        pending.append(item)
+        if len(pending) > depth:
+            yield pending.popleft()
+    yield from pending
+
+
+def _chunks(slides, size):
+    it = iter(slides)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _slide_objects(slides):
+    for n, slide_data in enumerate(slides, 1):
+        if not isinstance(slide_data, dict):
+            raise InvalidInput(f"slide {n}: expected an object, got {type(slide_data).__name__}")
+        yield slide_data
+
+
+def paginate_tables(slides):
+    """Expand every table slide into its pages, streaming the rows (tables.py)."""
+    from tables import paginate
+
+    for n, slide_data in enumerate(slides, 1):
+        area = TABLE_AREAS.get(slide_data.get("layout", "content"))
+        if area is None or not slide_data.get("table"):
+            yield slide_data
+            continue
+        try:
+            yield from paginate(slide_data, area)
+        except (OSError, ValueError, csv.Error) as e:
+            raise InvalidInput(f"slide {n} table: {e}") from e
+
+
+def fit_slides(slides, plan, policy, verbose=True):
+    """Fit each slide's text to its placeholders (textfit.py), streaming.
+
+    Overflowing fields get a "_font_sizes" entry, or with the "split" policy
+    the body continues on extra slides.
+    """
+    from textfit import Fitter
+
+    fitter = Fitter(cache_dir("fonts"), policy, verbose)
+    for slide_data in slides:
+        entry = plan.get(slide_data.get("layout", "content"))
+        if entry is None:
+            yield slide_data
+        else:
+            yield from fitter.fit(slide_data, entry)
+    if verbose and (fitter.shrunk or fitter.continued):
+        print(f"  Text fit: {fitter.shrunk} fields shrunk, "
+              f"{fitter.continued} continuation slides")
+
+
+def _render_parallel(prs, chunks, pool, verbose):
+    """Render chunks on the worker pool and merge them into `prs` in order."""
+    from slideparts import Splicer
+
+    splicer = Splicer(prs)
+    done = 0
+    started = ((chunk, pool.submit(chunk, images)) for chunk, images in chunks)
+    for chunk, future in _lookahead(started, pool.depth):
+        for bundle in future.result():
+            splicer.splice(bundle)
+        done += len(chunk)
+        if verbose:
+            print(f"  Slides {done - len(chunk) + 1}-{done} merged")
+
+
+PARALLEL_CHUNK = 25
+STREAM_CHUNK = 64
+SLIDE_CACHE_VERSION = 3
+
+
+class SlideCache:
+    """On-disk cache of rendered slides, stored as part bundles.
+
+    A slide's key covers its JSON, the contents of every picture and chart
+    data file it references, the template hash, the fill specs and the image options, so
+    any change to one of those re-renders just that slide. Picture blobs are
+    stored once under their SHA-1 rather than inside every slide entry.
+    """
+
+    def __init__(self, template, image_dpi=None, image_quality=85):
+        self.dir = cache_dir("slides")
+        self.blob_dir = cache_dir("slides", "blobs")
+        self._blobs = {}
+        self.plan = template.plan
+        self.salt = json.dumps([SLIDE_CACHE_VERSION, template.sha256, _specs_fingerprint(),
+                                image_dpi, image_quality]).encode()
+        self.hits = self.misses = 0
+
+    def key(self, slide_data):
+        from assets import shared_cache
+        from charts import fingerprint, source_path
+
+        # The asset cache only re-reads files whose stat() changed, which
+        # keeps long-running callers (--watch, --serve) cheap.
+        assets = shared_cache()
+        h = hashlib.sha256(self.salt)
+        h.update(json.dumps(slide_data, sort_keys=True).encode())
+        for path, _ in picture_jobs([slide_data], self.plan):
+            h.update(f"\0{path}\0{assets.sha1(path) or 'missing'}".encode())
+        path = source_path(slide_data.get("chart"))
+        if path:
+            h.update(f"\0{path}\0{fingerprint(path) or 'missing'}".encode())
+        return h.hexdigest()
+
+    def _blob(self, sha1):
+        if sha1 not in self._blobs:
+            with open(os.path.join(self.blob_dir, sha1), "rb") as f:
+                self._blobs[sha1] = f.read()
+        return self._blobs[sha1]
+
+    def get(self, key):
+        try:
+            with open(os.path.join(self.dir, key + ".pickle"), "rb") as f:
+                bundle = pickle.load(f)
+            for entry in bundle["parts"].values():
+                if "sha1" in entry:
+                    entry["blob"] = self._blob(entry.pop("sha1"))
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return bundle
+
+    def _write(self, path, data):
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def put(self, key, bundle):
+        parts = {}
+        for partname, entry in bundle["parts"].items():
+            if entry["content_type"].startswith("image/"):
+                sha1 = hashlib.sha1(entry["blob"]).hexdigest()
+                blob_path = os.path.join(self.blob_dir, sha1)
+                if sha1 not in self._blobs and not os.path.exists(blob_path):
+                    self._write(blob_path, entry["blob"])
+                self._blobs[sha1] = entry["blob"]
+                entry = {**entry, "blob": None, "sha1": sha1}
+            parts[partname] = entry
+        data = pickle.dumps({**bundle, "parts": parts}, protocol=pickle.HIGHEST_PROTOCOL)
+        self._write(os.path.join(self.dir, key + ".pickle"), data)
+
+
+def _render_incremental(prs, chunks, pool, cache, verbose):
+    """Splice cached slides into `prs` and render only the ones that changed."""
+    from slideparts import Splicer
+
+    def started():
+        for chunk, images in chunks:
+            keys = [cache.key(slide_data) for slide_data in chunk]
+            bundles = [cache.get(key) for key in keys]
+            misses = [i for i, bundle in enumerate(bundles) if bundle is None]
+            yield chunk, keys, bundles, misses, pool.submit([chunk[i] for i in misses], images)
+
+    splicer = Splicer(prs)
+    done = 0
+    for chunk, keys, bundles, misses, future in _lookahead(started(), pool.depth):
+        for i, bundle in zip(misses, future.result()):
+            cache.put(keys[i], bundle)
+            bundles[i] = bundle
+        missed = set(misses)
+        for i, (slide_data, bundle) in enumerate(zip(chunk, bundles)):
+            if verbose:
+                layout_name = slide_data.get("layout", "content")
+                state = "rendered" if i in missed else "cached"
+                print(f"  Slide {done + i + 1}: {layout_name} - "
+                      f"{slide_data.get('title', '')[:50]} ({state})")
+            splicer.splice(bundle)
+        done += len(chunk)
+
+    if verbose:
+        print(f"  Slide cache: {cache.hits} hits, {cache.misses} misses")
+
+
+def build_deck(template, slides, verbose=True, jobs=None, image_dpi=None, image_quality=85,
+               incremental=False, prune=False, fit="shrink"):
+    """Render `slides` into a fresh Presentation from `template`.
+
+    `slides` can be any iterable, such as the stream from iter_slides(): it
+    is consumed in chunks, so slides render as they arrive; table slides
+    become as many pages as their rows need. Text that overflows its
+    placeholder is handled by the `fit` policy (see fit_slides()). With `image_dpi`,
+    pictures are first downsampled to their placeholder size at that
+    resolution (see images.py). With `jobs` > 1, large decks are rendered in
+    chunks across that many worker processes and merged. With `incremental`,
+    unchanged slides come from the on-disk SlideCache. With `prune`, layouts
+    no slide uses are dropped from the finished deck along with their media.
+    """
+    if verbose:
+        count = f"{len(slides)} " if isinstance(slides, list) else ""
+        print(f"Generating {count}slides...")
+
+    slides = paginate_tables(_slide_objects(slides))
+    if fit != "none":
+        slides = fit_slides(slides, template.plan, fit, verbose)
+    chunks = _chunks(slides, PARALLEL_CHUNK if jobs and jobs > 1 else STREAM_CHUNK)
+    if jobs and jobs > 1:
+        # Not worth starting workers for a deck that fits in one chunk.
+        head = list(itertools.islice(chunks, 2))
+        if len(head) < 2:
+            jobs = None
+        chunks = itertools.chain(head, chunks)
+
+    preparer = None
+    if image_dpi:
+        from images import ImagePreparer
+        preparer = ImagePreparer(image_dpi, image_quality, cache_dir("images"))
+        chunks = ((chunk, preparer.prepare(picture_jobs(chunk, template.plan)))
+                  for chunk in chunks)
+    else:
+        chunks = ((chunk, None) for chunk in chunks)
+
+    prs = template.new_presentation()
+    pool = RenderPool(template, jobs)
+    try:
+        if incremental:
+            cache = SlideCache(template, image_dpi, image_quality)
+            _render_incremental(prs, chunks, pool, cache, verbose)
+        elif pool.jobs:
+            _render_parallel(prs, chunks, pool, verbose)
+        else:
+            done = 0
+            for chunk, images in chunks:
+                render(prs, chunk, template.plan, verbose, images, first=done + 1)
+                done += len(chunk)
+    finally:
+        pool.close()
+        if preparer:
+            preparer.close()
+
+    if prune:
+        from slideparts import prune as prune_package
+        layouts, parts, size = prune_package(prs)
+        if verbose:
+            # Part sizes before zip compression; the file shrinks by less.
+            print(f"  Pruned {layouts} unused layouts, {parts} parts "
+                  f"({size / 1024:.0f} KB uncompressed)")
+    return prs
+
+
+def save_presentation(prs, output, zip_level=None):
+    """Save `prs` through the streaming writer in zipwriter.py.
+
+    `output` may be a binary file object or a file descriptor, which are
+    written directly. Paths are saved atomically: a temp file is written
+    next to the output and renamed over it, so a viewer that opens the
+    output mid-save sees either the old deck or the new one.
+    """
+    from zipwriter import write_package
+
+    if not isinstance(output, (str, os.PathLike)):
+        write_package(prs, output, zip_level)
+        return
+    output_path = Path(output)
+    tmp = output_path.with_name(f".{output_path.name}.{os.getpid()}.tmp")
+    try:
+        write_package(prs, str(tmp), zip_level)
+        os.replace(tmp, output_path)
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp)
+
+
+def generate(input_path, output_path, template_path=None, template=None, zip_level=None,
+             **render_opts):
+    """Generate a presentation from JSON input.
+
+    Pass a `template` from load_template() to skip the template lookup;
+    otherwise it comes from the process-wide TemplateRegistry.
+    `render_opts` are passed through to build_deck(). Slides are streamed
+    from the input, see iter_slides(). `output_path` may also be a binary
+    file object or descriptor, see save_presentation(). Raises InvalidInput
+    if the input cannot be read, is malformed or has no slides.
+    """
+    if template is None:
+        template = get_template(template_path)
+
+    try:
+        prs = build_deck(template, _read_input(input_path), **render_opts)
+    except InvalidInput:
+        raise
+    except ValueError as e:
+        raise InvalidInput(f"Invalid input JSON: {e}") from e
+    if len(prs.slides) == 0:
+        raise InvalidInput("No slides in input JSON")
+
+    save_presentation(prs, output_path, zip_level)
+    if isinstance(output_path, int):
+        output_path = f"/dev/fd/{output_path}"
+    print(f"\n✅ Saved to {getattr(output_path, 'name', output_path)}")
+    print(f"   {len(prs.slides)} slides generated using Airship brand template")
+
+
+# Library API: in-memory rendering for services, raising SlideGenError
+# subclasses instead of exiting.
+_registry = TemplateRegistry()
+
+
+def get_template(template_path=None):
+    """load_template() through the process-wide TemplateRegistry."""
+    return _registry.get(template_path)
+
+
+def render_pptx(slides, template=None, assets=None, output=None, validate=True,
+                zip_level=None, **render_opts):
+    """Render slides to a PPTX in memory.
+
+    `slides` is an input document ({"slides": [...]}) or the slide list.
+    `template` is a Template, a template path, or None for the bundled
+    master. `assets` maps the icon/image names the slides use to their
+    bytes; other names are read from disk as usual. Returns the PPTX bytes,
+    or writes them to `output` (a writable binary buffer) and returns it.
+    `render_opts` are passed through to build_deck().
+
+    Raises InvalidInput (every validation error is in .errors),
+    TemplateNotFound or MissingDependency.
+    """
+    from assets import memory_assets
+
+    if isinstance(slides, dict):
+        slides = slides.get("slides", [])
+    slides = list(slides)
     if not slides:
-        print("Error: No slides in input JSON")
+        raise InvalidInput("No slides in input JSON")
+    assets = assets or {}
+    if validate:
+        errors = check_slides(slides, asset_exists=lambda p: p in assets or os.path.exists(p))
+        if errors:
+            raise InvalidInput(f"{len(errors)} errors in input, first: {errors[0]}", errors)
+    if assets and render_opts.get("jobs"):
+        raise SlideGenError("in-memory assets cannot be used with worker processes (jobs)")
+    if not isinstance(template, Template):
+        template = get_template(template)
+
+    with memory_assets(assets):
+        prs = build_deck(template, slides, verbose=False, **render_opts)
+    buf = output if output is not None else io.BytesIO()
+    save_presentation(prs, buf, zip_level)
+    return output if output is not None else buf.getvalue()
+
+
+class AsyncRenderer:
+    """render_pptx() for asyncio code, on a bounded pool of render threads.
+
+    At most `max_workers` decks render at once; further requests wait for a
+    free thread without blocking the event loop. Use as an async context
+    manager, or call close() when done.
+    """
+
+    def __init__(self, max_workers=4, template=None):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.template = template
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="airship-render")
+
+    async def render(self, slides, **kwargs):
+        """Await render_pptx(slides, **kwargs) on the pool."""
+        import asyncio
+        import functools
+
+        kwargs.setdefault("template", self.template)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor,
+                                          functools.partial(render_pptx, slides, **kwargs))
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+
+_async_renderer = None
+
+
+async def render_pptx_async(slides, **kwargs):
+    """render_pptx() on a shared AsyncRenderer with the default pool size."""
+    global _async_renderer
+    if _async_renderer is None:
+        _async_renderer = AsyncRenderer()
+    return await _async_renderer.render(slides, **kwargs)
+
+
+def asset_paths(slides, plan):
+    """Every file the slides pull in (pictures, chart data, table CSVs), as absolute paths."""
+    from charts import source_path
+
+    paths = {os.path.abspath(path) for path, _ in picture_jobs(slides, plan)}
+    for slide_data in slides:
+        table = slide_data.get("table")
+        for path in (source_path(slide_data.get("chart")),
+                     table.get("csv") if isinstance(table, dict) else None):
+            if isinstance(path, str):
+                paths.add(os.path.abspath(path))
+    return paths
+
+
+def watch(input_path, output_path, template_path=None, debounce=0.3, zip_level=None,
+          **render_opts):
+    """Re-render whenever the input JSON, a referenced asset or the template changes.
+
+    Rebuilds are incremental, so only slides touched by the change are
+    re-rendered, and the output is replaced atomically.
+    """
+    from watch import make_watcher, wait_for_changes
+
+    template_path = find_template(template_path)
+    input_path = os.path.abspath(input_path)
+    template_path = os.path.abspath(template_path)
+    render_opts["incremental"] = True
+    watcher = make_watcher()
+    template = None
+    changed = {template_path}
+    print(f"Watching {input_path} ({type(watcher).__name__}), Ctrl-C to stop")
+    try:
+        while True:
+            start = time.perf_counter()
+            watched = {input_path, template_path}
+            try:
+                if template_path in changed or template is None:
+                    template = get_template(template_path)
+                slides = load_slides(input_path)
+                if not slides:
+                    raise ValueError("no slides in input JSON")
+                watched |= asset_paths(slides, template.plan)
+                prs = build_deck(template, slides, verbose=False, **render_opts)
+                save_presentation(prs, output_path, zip_level)
+                print(f"✅ {time.strftime('%H:%M:%S')} saved {output_path} "
+                      f"({len(slides)} slides, {time.perf_counter() - start:.2f}s)")
+            except Exception as e:
+                # Keep watching: the next save usually fixes a half-edited file.
+                print(f"❌ {time.strftime('%H:%M:%S')} {e}")
+            watcher.watch(watched)
+            changed = wait_for_changes(watcher, debounce)
+            names = ", ".join(sorted(os.path.basename(p) for p in changed))
+            print(f"   changed: {names}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+def load_manifest(manifest_path):
+    """Return [(input, output, template), ...] from a batch manifest file.
+
+    A deck's "template" is optional; None means the batch's template. Raises
+    InvalidInput for an unreadable manifest or a malformed deck entry.
+    """
+    base = Path(manifest_path).parent
+    try:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise InvalidInput(f"Cannot read manifest {manifest_path}: {e}") from e
+    decks = manifest.get("decks", []) if isinstance(manifest, dict) else manifest
+    if not isinstance(decks, list):
+        raise InvalidInput(f"Manifest {manifest_path}: \"decks\" must be a list")
+    jobs = []
+    for i, d in enumerate(decks):
+        if not (isinstance(d, dict) and isinstance(d.get("input"), str)
+                and isinstance(d.get("output"), str)
+                and isinstance(d.get("template") or "", str)):
+            raise InvalidInput(f"Manifest {manifest_path}, deck {i}: "
+                               f"expected an object with \"input\" and \"output\" paths")
+        jobs.append((base / d["input"], base / d["output"],
+                     base / d["template"] if d.get("template") else None))
+    return jobs
+
+
+def glob_jobs(pattern, out_dir):
+    """Return [(input, output, None), ...] for every JSON matching `pattern`."""
+    out_dir = Path(out_dir)
+    return [(Path(p), out_dir / (Path(p).stem + ".pptx"), None)
+            for p in sorted(glob.glob(pattern, recursive=True))]
+
+
+def generate_batch(jobs, template_path=None, zip_level=None, **render_opts):
+    """Render many decks, parsing each template they use only once.
+
+    Templates come from the process-wide TemplateRegistry, so decks can
+    switch masters freely. Returns the number of decks that failed.
+    """
+    start = time.perf_counter()
+    get_template(template_path)
+    loaded = time.perf_counter()
+    print(f"Loaded template in {loaded - start:.2f}s, rendering {len(jobs)} decks...")
+
+    done = failed = slide_count = 0
+    for input_path, output_path, deck_template in jobs:
+        try:
+            template = get_template(deck_template or template_path)
+            prs = build_deck(template, iter_slides(input_path), verbose=False, **render_opts)
+            if len(prs.slides) == 0:
+                raise ValueError("no slides in input JSON")
+            os.makedirs(Path(output_path).parent, exist_ok=True)
+            save_presentation(prs, output_path, zip_level)
+        except (SlideGenError, OSError, ValueError) as e:
+            failed += 1
+            print(f"  ❌ {input_path}: {e}")
+            continue
+        done += 1
+        slide_count += len(prs.slides)
+        print(f"  ✅ {output_path} ({len(prs.slides)} slides)")
+
+    elapsed = time.perf_counter() - start
+    rate = done / elapsed if elapsed > 0 else 0.0
+    print(f"\n{done} decks ({slide_count} slides) in {elapsed:.2f}s — {rate:.1f} decks/s")
+    if failed:
+        print(f"   {failed} decks failed")
+    return failed
+
+
+def default_socket_path():
+    """Where the render daemon listens unless --socket says otherwise."""
+    if os.environ.get("AIRSHIP_SLIDES_SOCKET"):
+        return os.environ["AIRSHIP_SLIDES_SOCKET"]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or "/tmp"
+    return os.path.join(runtime_dir, f"airship-slides-{os.getuid()}.sock")
+
+
+@contextlib.contextmanager
+def _working_dir(path):
+    """Run the block with `path` as the working directory (None: unchanged)."""
+    if not path:
+        yield
+        return
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+class RenderServer:
+    """Render jobs against templates that are parsed once and kept in memory."""
+
+    # Job keys that are passed through to build_deck().
+    RENDER_OPTS = ("image_dpi", "image_quality", "jobs", "incremental", "prune", "fit")
+
+    def __init__(self, template_path=None, zip_level=None, **render_opts):
+        # Absolute, since jobs run in their client's working directory.
+        self.default_template = os.path.abspath(template_path or default_template_path())
+        self.zip_level = zip_level
+        self.render_opts = render_opts
+        self._lock = threading.Lock()
+        self.shutdown_requested = False
+
+    def template(self, template_path):
+        return get_template(template_path)
+
+    def handle(self, job):
+        """Run one job dict and return the response dict."""
+        op = job.get("op", "render")
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid()}
+        if op == "shutdown":
+            self.shutdown_requested = True
+            return {"ok": True}
+        if op != "render":
+            return {"ok": False, "error": f"unknown op '{op}'"}
+
+        start = time.perf_counter()
+        try:
+            # python-pptx objects are not thread-safe; one render at a time.
+            # That also makes it safe to switch to the client's directory, so
+            # its relative paths resolve as they would without the daemon.
+            with self._lock, _working_dir(job.get("cwd")), \
+                    contextlib.redirect_stdout(sys.stderr):
+                slides = job["slides"] if "slides" in job else iter_slides(job["input"])
+                template = self.template(job.get("template") or self.default_template)
+                opts = {**self.render_opts,
+                        **{k: job[k] for k in self.RENDER_OPTS if k in job}}
+                prs = build_deck(template, slides, verbose=False, **opts)
+                if len(prs.slides) == 0:
+                    raise ValueError("no slides in input JSON")
+                zip_level = job.get("zip_level", self.zip_level)
+                output_path = job.get("output")
+                if output_path:
+                    output_path = os.path.abspath(output_path)
+                    save_presentation(prs, output_path, zip_level)
+                else:
+                    buf = io.BytesIO()
+                    save_presentation(prs, buf, zip_level)
+        except (SlideGenError, KeyError, OSError, ValueError) as e:
+            return {"ok": False, "error": str(e)}
+        except Exception as e:
+            # A malformed job must not take the daemon down with it.
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+        response = {"ok": True, "slides": len(prs.slides),
+                    "ms": round((time.perf_counter() - start) * 1000, 1)}
+        if output_path:
+            response["output"] = output_path
+        else:
+            response["bytes"] = base64.b64encode(buf.getvalue()).decode("ascii")
+        return response
+
+    def handle_line(self, line):
+        try:
+            job = json.loads(line)
+        except json.JSONDecodeError as e:
+            return {"ok": False, "error": f"bad job JSON: {e}"}
+        if not isinstance(job, dict):
+            return {"ok": False, "error": "bad job JSON: expected an object"}
+        response = self.handle(job)
+        if "id" in job:
+            response["id"] = job["id"]
+        return response
+
+
+def serve_stdio(server):
+    """Answer JSON-line jobs from stdin on stdout until EOF or shutdown."""
+    out = sys.stdout
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        out.write(json.dumps(server.handle_line(line)) + "\n")
+        out.flush()
+        if server.shutdown_requested:
+            break
+
+
+def serve_socket(server, socket_path):
+    """Answer JSON-line jobs on a Unix socket until a shutdown job arrives."""
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                response = server.handle_line(line)
+                self.wfile.write((json.dumps(response) + "\n").encode())
+                if server.shutdown_requested:
+                    threading.Thread(target=listener.shutdown, daemon=True).start()
+                    return
+
+    if os.path.exists(socket_path):
+        if _daemon_request(socket_path, {"op": "ping"}, timeout=0.5):
+            raise SlideGenError(f"a render daemon is already listening on {socket_path}")
+        os.unlink(socket_path)
+
+    listener = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+    listener.daemon_threads = True
+    os.chmod(socket_path, 0o600)
+    print(f"Render daemon listening on {socket_path}", file=sys.stderr)
+    try:
+        listener.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(socket_path)
+
+
+def _daemon_request(socket_path, job, timeout=None):
+    """Send one job to a running daemon; None if nothing is listening."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            sock.sendall((json.dumps(job) + "\n").encode())
+            with sock.makefile("rb") as f:
+                line = f.readline()
+    except OSError:
+        return None
+    return json.loads(line) if line else None
+
+
+def generate_via_daemon(input_path, output_path, template_path=None, socket_path=None,
+                        zip_level=None, **render_opts):
+    """Hand a render job to a running daemon; False if none is available."""
+    socket_path = socket_path or default_socket_path()
+    if not os.path.exists(socket_path):
+        return False
+    job = {"input": os.path.abspath(input_path), "output": os.path.abspath(output_path),
+           "cwd": os.getcwd(), **render_opts}
+    if template_path:
+        job["template"] = os.path.abspath(template_path)
+    if zip_level is not None:
+        job["zip_level"] = zip_level
+    response = _daemon_request(socket_path, job)
+    if response is None:
+        return False
+    if not response.get("ok"):
+        raise SlideGenError(response.get("error"))
+    print(f"✅ Saved to {output_path}")
+    print(f"   {response['slides']} slides rendered by daemon in {response['ms']:.0f} ms")
+    return True
+
+
+def main(argv=None):
+    try:
+        _main(argv)
+    except SlideGenError as e:
+        # On stderr, so a deck being written to stdout is never mixed with it.
+        print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
-    # Load template and clear existing slides
-    prs = Presentation(str(template_path))
-    clear_slides(prs)
 
-    print(f"Generating {len(slides)} slides...")
+def _main(argv):
+    parser = argparse.ArgumentParser(
+        description="Generate branded Airship presentations from JSON.",
+        epilog="See script docstring for JSON input format.")
+    parser.add_argument("input", nargs="?", help="input JSON or JSONL file, - for stdin")
+    parser.add_argument("output", nargs="?", help="output PPTX file, - for stdout")
+    parser.add_argument("template", nargs="?", help="template PPTX (default: bundled Airship master)")
+    parser.add_argument("--batch", metavar="GLOB", help="render every input JSON matching GLOB")
+    parser.add_argument("--out-dir", default=".", help="output directory for --batch (default: .)")
+    parser.add_argument("--manifest", metavar="FILE", help="render the decks listed in a manifest JSON")
+    parser.add_argument("--template", dest="template_opt", metavar="PPTX", help="template PPTX")
+    parser.add_argument("--serve", action="store_true", help="run as a render daemon")
+    parser.add_argument("--stdio", action="store_true", help="with --serve: JSON lines on stdin/stdout")
+    parser.add_argument("--socket", metavar="PATH", help="daemon socket (default: %(default)s)",
+                        default=default_socket_path())
+    parser.add_argument("--no-daemon", action="store_true", help="always render in this process")
+    parser.add_argument("--image-dpi", type=int, metavar="DPI",
+                        help="downsample pictures to their placeholder size at DPI (e.g. 150)")
+    parser.add_argument("--image-quality", type=int, default=85, metavar="Q",
+                        help="JPEG quality for --image-dpi (default: %(default)s)")
+    parser.add_argument("-j", "--jobs", type=int, metavar="N",
+                        help="render large decks across N worker processes (0 = all cores)")
+    parser.add_argument("-i", "--incremental", action="store_true",
+                        help="reuse cached renders of unchanged slides")
+    parser.add_argument("--prune", action="store_true",
+                        help="drop layouts no slide uses, and their media, from the output")
+    parser.add_argument("--fit", choices=("shrink", "split", "none"), default="shrink",
+                        help="text that overflows its placeholder: shrink it, split the "
+                             "body onto continuation slides, or leave it (default: %(default)s)")
+    parser.add_argument("--zip-level", type=int, choices=range(10), metavar="0-9",
+                        help="deflate level for XML parts, 0 = store (default: 6); "
+                             "media that is already compressed is always stored")
+    parser.add_argument("--profile", metavar="REPORT",
+                        help="write a JSON timing/memory profile of the run to REPORT")
+    parser.add_argument("--profile-stats", metavar="FILE",
+                        help="with --profile: also dump cProfile stats (pstats format) to FILE")
+    parser.add_argument("--check", action="store_true",
+                        help="validate the input(s) against the layout schema and exit; "
+                             "does not load python-pptx or the template")
+    parser.add_argument("-w", "--watch", action="store_true",
+                        help="re-render whenever the input, its assets or the template change")
+    parser.add_argument("--debounce", type=float, default=0.3, metavar="SECONDS",
+                        help="with --watch: quiet period before rebuilding (default: %(default)s)")
+    args = parser.parse_args(argv)
 
-    for i, slide_data in enumerate(slides):
-        layout_name = slide_data.get("layout", "content")
-        print(f"  Slide {i+1}: {layout_name} - {slide_data.get('title', '')[:50]}")
-        add_slide(prs, slide_data)
+    template_path = args.template_opt or args.template
+    render_opts = {}
+    if args.image_dpi:
+        render_opts.update(image_dpi=args.image_dpi, image_quality=args.image_quality)
+    if args.jobs is not None:
+        render_opts["jobs"] = args.jobs or os.cpu_count()
+    if args.incremental:
+        render_opts["incremental"] = True
+    if args.prune:
+        render_opts["prune"] = True
+    if args.fit != "shrink":
+        render_opts["fit"] = args.fit
+    zip_level = args.zip_level
 
-    prs.save(output_path)
-    print(f"\n✅ Saved to {output_path}")
-    print(f"   {len(slides)} slides generated using Airship brand template")
+    if args.serve:
+        server = RenderServer(template_path, zip_level, **render_opts)
+        if os.path.exists(server.default_template):
+            server.template(server.default_template)
+        if args.stdio:
+            serve_stdio(server)
+        else:
+            serve_socket(server, args.socket)
+        return
 
+    if args.batch or args.manifest:
+        jobs = load_manifest(args.manifest) if args.manifest else glob_jobs(args.batch, args.out_dir)
+        if not jobs:
+            raise SlideGenError("No input decks found")
+        if args.check:
+            sys.exit(1 if check_inputs([input_path for input_path, _, _ in jobs]) else 0)
+        sys.exit(1 if generate_batch(jobs, template_path, zip_level, **render_opts) else 0)
 
-if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print("Usage: python3 generate.py <input.json> <output.pptx> [template.pptx]")
+    if args.check and args.input:
+        sys.exit(1 if check_inputs([args.input]) else 0)
+
+    if not args.input or not args.output:
+        parser.print_usage()
         print("\nSee script docstring for JSON input format.")
         sys.exit(1)
 
-    input_path = sys.argv[1]
-    output_path = sys.argv[2]
-    template_path = sys.argv[3] if len(sys.argv) > 3 else None
+    if args.watch:
+        if args.input == "-":
+            raise SlideGenError("--watch needs an input file, not stdin")
+        watch(args.input, args.output, template_path, args.debounce, zip_level, **render_opts)
+        return
+
+    if args.profile:
+        from profiling import Profile
+
+        if render_opts.pop("jobs", None):
+            print("Note: --profile renders in this process, ignoring -j")
+        # A daemon would do the work out of sight of the profiler.
+        args.no_daemon = True
+        profile = Profile(sys.modules[__name__], args.profile_stats)
+    else:
+        profile = contextlib.nullcontext()
+
+    with profile:
+        _generate_cli(args, template_path, zip_level, render_opts)
+    if args.profile:
+        # Like the rest of the log, the summary stays off a deck written to stdout.
+        with contextlib.redirect_stdout(sys.stderr if args.output == "-" else sys.stdout):
+            profile.write(args.profile)
 
-    generate(input_path, output_path, template_path)
+
+def _generate_cli(args, template_path, zip_level, render_opts):
+    output = _output_target(args.output)
+    if not isinstance(output, str):
+        # The deck goes to stdout or an inherited descriptor; keep progress off it.
+        with contextlib.redirect_stdout(sys.stderr):
+            generate(args.input, output, template_path, zip_level=zip_level, **render_opts)
+        return
+
+    # The daemon cannot read our stdin, so streamed input always renders here.
+    if args.input != "-" and not args.no_daemon and generate_via_daemon(
+            args.input, output, template_path, args.socket, zip_level, **render_opts):
+        return
+
+    generate(args.input, output, template_path, zip_level=zip_level, **render_opts)
+
+
+def check_inputs(input_paths):
+    """Print validation results for each input; returns the number that failed."""
+    failed = 0
+    for input_path in input_paths:
+        count, errors = check_input(input_path)
+        if errors:
+            failed += 1
+            print(f"❌ {input_path}: {len(errors)} errors")
+            for error in errors:
+                print(f"   {error}")
+        else:
+            print(f"✅ {input_path}: {count} slides OK")
+    return failed
+
+
+def _output_target(output):
+    """"-" -> stdout's binary stream, "/dev/fd/N" -> descriptor N, else the path."""
+    if output == "-":
+        return sys.stdout.buffer
+    if output.startswith("/dev/fd/") and output[len("/dev/fd/"):].isdigit():
+        return int(output[len("/dev/fd/"):])
+    return output
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Downsample and recompress images to the size of the placeholder they fill.
+
+Used by generate.py --image-dpi. A picture placeholder of W x H EMU needs at
+most W/914400 * dpi by H/914400 * dpi pixels; anything larger only makes the
+deck bigger and slower to save. Results are cached on disk, keyed by the
+source file's hash, the target pixel size and the JPEG quality, so repeated
+runs only pay for new or changed images.
+
+Requires Pillow (pip3 install Pillow); without it images pass through as-is.
+"""
+
+import hashlib
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+EMU_PER_INCH = 914400
+
+
+def target_pixels(box, dpi):
+    """Pixel size needed to fill a (cx, cy) EMU box at `dpi`."""
+    cx, cy = box
+    return (max(1, math.ceil(cx / EMU_PER_INCH * dpi)),
+            max(1, math.ceil(cy / EMU_PER_INCH * dpi)))
+
+
+def _source_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _smaller(cached, path):
+    """`cached` unless it is no smaller than the original `path`."""
+    return cached if os.path.getsize(cached) < os.path.getsize(path) else path
+
+
+def prepare_image(path, size, quality, cache_root):
+    """Return a path to `path` scaled to cover `size` pixels, or `path` itself.
+
+    Pictures are cropped to fill their placeholder, so the image is scaled
+    until its shorter side fits; images already that small are left alone.
+    """
+    from PIL import Image, ImageOps
+
+    tw, th = size
+    key = hashlib.sha256(f"{_source_hash(path)}:{tw}x{th}:q{quality}".encode()).hexdigest()
+    for ext in (".jpg", ".png"):
+        cached = os.path.join(cache_root, key + ext)
+        if os.path.exists(cached):
+            # Same answer as when the file was first written, run after run.
+            return _smaller(cached, path)
+
+    with Image.open(path) as img:
+        img = ImageOps.exif_transpose(img)
+        w, h = img.size
+        scale = max(tw / w, th / h)
+        if scale >= 1:
+            return path
+        img = img.resize((max(1, round(w * scale)), max(1, round(h * scale))), Image.LANCZOS)
+
+        has_alpha = img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+        if has_alpha or img.mode == "P":
+            ext, fmt, params = ".png", "PNG", {"optimize": True}
+        else:
+            if img.mode not in ("RGB", "L", "CMYK"):
+                img = img.convert("RGB")
+            ext, fmt, params = ".jpg", "JPEG", {"quality": quality, "optimize": True}
+
+        cached = os.path.join(cache_root, key + ext)
+        tmp = f"{cached}.{os.getpid()}.tmp"
+        img.save(tmp, fmt, **params)
+    os.replace(tmp, cached)
+
+    # Never hand back something bigger than the original.
+    return _smaller(cached, path)
+
+
+def _prepare_job(job):
+    path, size, quality, cache_root = job
+    try:
+        return prepare_image(path, size, quality, cache_root), None
+    except Exception as e:
+        return path, f"{path}: {e}"
+
+
+class ImagePreparer:
+    """Preprocesses pictures batch by batch across one reusable process pool.
+
+    Results are remembered, so an image that shows up again in a later batch
+    (the same icon on many slides) is only looked at once.
+    """
+
+    def __init__(self, dpi, quality, cache_root, workers=None):
+        self.dpi = dpi
+        self.quality = quality
+        self.cache_root = cache_root
+        self.workers = workers
+        self._pool = None
+        self._prepared = {}
+        try:
+            import PIL  # noqa: F401
+            self.enabled = True
+        except ImportError:
+            print("  Warning: Pillow is not installed, images are inserted unprocessed "
+                  "(pip3 install Pillow)")
+            self.enabled = False
+
+    def prepare(self, jobs):
+        """Preprocess every (path, (cx, cy)) in `jobs`.
+
+        Returns {(path, cx, cy): prepared_path}. Missing files are skipped, and
+        failures fall back to the original path with a warning.
+        """
+        if not self.enabled:
+            return {}
+        todo = {}
+        for path, box in jobs:
+            key = (path, *box)
+            if key not in self._prepared and key not in todo and os.path.exists(path):
+                todo[key] = (path, target_pixels(box, self.dpi), self.quality, self.cache_root)
+
+        if todo:
+            keys = list(todo)
+            work = [todo[k] for k in keys]
+            if len(work) == 1 or self.workers == 1:
+                results = map(_prepare_job, work)
+            else:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                results = self._pool.map(_prepare_job, work, chunksize=4)
+            for key, (result, error) in zip(keys, results):
+                if error:
+                    print(f"  Warning: Could not preprocess image {error}")
+                self._prepared[key] = result
+
+        return {(path, *box): self._prepared[(path, *box)]
+                for path, box in jobs if (path, *box) in self._prepared}
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+def prepare_images(jobs, dpi, quality, cache_root, workers=None):
+    """One-shot ImagePreparer.prepare() for callers with a single batch."""
+    preparer = ImagePreparer(dpi, quality, cache_root, workers)
+    try:
+        return preparer.prepare(jobs)
+    finally:
+        preparer.close()
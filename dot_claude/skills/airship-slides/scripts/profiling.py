@@ -0,0 +1,247 @@
+"""
+Instrumentation for generate.py --profile.
+
+Profile patches timing wrappers over a handful of generate.py functions for
+the duration of a run, so an unprofiled run pays nothing. It records wall
+and CPU time per phase and per layout, text fills versus picture fills,
+placeholder lookups, picture bytes inserted and tracemalloc peaks, and
+writes them as a JSON report. With a stats path it also runs cProfile and
+dumps a pstats file (view with `python3 -m pstats FILE`).
+
+Only work done in this process is seen: -j worker processes and the render
+daemon are not instrumented.
+"""
+
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+
+
+class _Timing:
+    __slots__ = ("calls", "wall", "cpu")
+
+    def __init__(self):
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+
+    def add(self, wall, cpu):
+        self.calls += 1
+        self.wall += wall
+        self.cpu += cpu
+
+    def as_dict(self):
+        return {"calls": self.calls, "wall": round(self.wall, 6), "cpu": round(self.cpu, 6)}
+
+
+class _CountingDict(dict):
+    """Placeholder map that counts .get() lookups for the profile."""
+
+    def __init__(self, items, profile):
+        super().__init__(items)
+        self._profile = profile
+
+    def get(self, key, default=None):
+        self._profile.counters["placeholder_lookups"] += 1
+        value = super().get(key, default)
+        if value is None:
+            self._profile.counters["placeholder_misses"] += 1
+        return value
+
+
+class Profile:
+    """Context manager that instruments `module` (generate.py) while active."""
+
+    # Phases timed by wrapping the generate.py function of the same name.
+    PHASES = {"load_template": "template", "build_deck": "build", "save_presentation": "save"}
+
+    def __init__(self, module, stats_path=None):
+        self.module = module
+        self.stats_path = stats_path
+        self.phases = {}
+        self.layouts = {}
+        self.fills = {"text": _Timing(), "picture": _Timing()}
+        self.counters = {"slides": 0, "placeholder_lookups": 0, "placeholder_misses": 0,
+                         "pictures_inserted": 0, "picture_bytes": 0}
+        self.peaks = {}
+        self.peak = 0
+        self._active = []
+        self._patched = []
+        self._profiler = None
+
+    def _timing(self, table, key):
+        timing = table.get(key)
+        if timing is None:
+            timing = table[key] = _Timing()
+        return timing
+
+    def _patch(self, owner, name, wrapper):
+        original = getattr(owner, name)
+        self._patched.append((owner, name, original))
+        setattr(owner, name, wrapper(original))
+
+    def _phase(self, phase):
+        """Wrapper factory: time calls as `phase` and record their memory peak."""
+        def wrap(func):
+            def timed(*args, **kwargs):
+                self._fold_peak()
+                frame = [phase, 0]
+                self._active.append(frame)
+                wall, cpu = time.perf_counter(), time.process_time()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self._timing(self.phases, phase).add(time.perf_counter() - wall,
+                                                         time.process_time() - cpu)
+                    self._fold_peak()
+                    self._active.pop()
+                    self.peaks[phase] = max(self.peaks.get(phase, 0), frame[1])
+            return timed
+        return wrap
+
+    def _fold_peak(self):
+        """Credit the peak since the last reset to every running phase, then reset.
+
+        tracemalloc has a single peak counter, so nested phases share it.
+        """
+        peak = tracemalloc.get_traced_memory()[1]
+        self.peak = max(self.peak, peak)
+        for frame in self._active:
+            frame[1] = max(frame[1], peak)
+        tracemalloc.reset_peak()
+
+    def _timed_iter(self, phase):
+        """Wrapper factory for generators: time each step as `phase`."""
+        def wrap(func):
+            def timed(*args, **kwargs):
+                it = iter(func(*args, **kwargs))
+                timing = self._timing(self.phases, phase)
+                while True:
+                    wall, cpu = time.perf_counter(), time.process_time()
+                    try:
+                        item = next(it)
+                    except StopIteration:
+                        return
+                    finally:
+                        timing.add(time.perf_counter() - wall, time.process_time() - cpu)
+                    yield item
+            return timed
+        return wrap
+
+    def _fill(self, kind):
+        def wrap(func):
+            def timed(ph, *args):
+                wall, cpu = time.perf_counter(), time.process_time()
+                ok = func(ph, *args)
+                self.fills[kind].add(time.perf_counter() - wall, time.process_time() - cpu)
+                if ok and kind == "picture":
+                    self.counters["pictures_inserted"] += 1
+                    self.counters["picture_bytes"] += os.path.getsize(args[-1])
+                return ok
+            return timed
+        return wrap
+
+    def _add_slide(self, func):
+        def timed(prs, slide_data, *args, **kwargs):
+            wall, cpu = time.perf_counter(), time.process_time()
+            slide = func(prs, slide_data, *args, **kwargs)
+            layout = slide_data.get("layout", "content")
+            self._timing(self.layouts, layout).add(time.perf_counter() - wall,
+                                                   time.process_time() - cpu)
+            self.counters["slides"] += 1
+            return slide
+        return timed
+
+    def _placeholder_map(self, func):
+        def counted(slide):
+            return _CountingDict(func(slide), self)
+        return counted
+
+    def _clone_slide(self, func):
+        # The skeleton fast path for text-only slides looks placeholders up
+        # in the map clone_slide() returns instead of _placeholder_map().
+        def counted(prs, layout):
+            slide_part, sps = func(prs, layout)
+            return slide_part, _CountingDict(sps, self)
+        return counted
+
+    def __enter__(self):
+        import images
+        import slideparts
+
+        m = self.module
+        for name, phase in self.PHASES.items():
+            self._patch(m, name, self._phase(phase))
+        self._patch(m, "iter_slides", self._timed_iter("parse"))
+        self._patch(images.ImagePreparer, "prepare", self._phase("images"))
+        self._patch(slideparts, "prune", self._phase("prune"))
+        self._patch(m, "add_slide", self._add_slide)
+        self._patch(m, "_set_text", self._fill("text"))
+        self._patch(m, "_write_text", self._fill("text"))
+        self._patch(m, "_set_image", self._fill("picture"))
+        self._patch(m, "_placeholder_map", self._placeholder_map)
+        self._patch(slideparts, "clone_slide", self._clone_slide)
+
+        tracemalloc.start()
+        if self.stats_path:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._start = (time.perf_counter(), time.process_time())
+        return self
+
+    def __exit__(self, *exc):
+        self.wall = time.perf_counter() - self._start[0]
+        self.cpu = time.process_time() - self._start[1]
+        if self._profiler:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.stats_path)
+        self._fold_peak()
+        tracemalloc.stop()
+        for owner, name, original in reversed(self._patched):
+            setattr(owner, name, original)
+        self._patched.clear()
+
+    def report(self):
+        """The profile as a JSON-ready dict.
+
+        "render" is build time not spent parsing input, preparing images or
+        pruning, i.e. adding, filling and merging slides.
+        """
+        phases = {name: t.as_dict() for name, t in self.phases.items()}
+        if "build" in self.phases:
+            nested = sum(self.phases[p].wall for p in ("parse", "images", "prune")
+                         if p in self.phases)
+            nested_cpu = sum(self.phases[p].cpu for p in ("parse", "images", "prune")
+                             if p in self.phases)
+            phases["render"] = {"calls": self.phases["build"].calls,
+                                "wall": round(self.phases["build"].wall - nested, 6),
+                                "cpu": round(self.phases["build"].cpu - nested_cpu, 6)}
+        for name, peak in self.peaks.items():
+            phases[name]["peak_bytes"] = peak
+        layouts = dict(sorted(((name, t.as_dict()) for name, t in self.layouts.items()),
+                              key=lambda item: -item[1]["wall"]))
+        for stats in layouts.values():
+            stats["mean"] = round(stats["wall"] / stats["calls"], 6)
+        return {"wall": round(self.wall, 6), "cpu": round(self.cpu, 6),
+                "peak_bytes": self.peak, "phases": phases, "layouts": layouts,
+                "fills": {kind: t.as_dict() for kind, t in self.fills.items()},
+                "counters": self.counters}
+
+    def write(self, path):
+        """Write report() to `path` and print a short summary."""
+        report = self.report()
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nProfile: {report['wall']:.2f}s wall, {report['cpu']:.2f}s CPU, "
+              f"peak {report['peak_bytes'] / 2**20:.1f} MB traced")
+        for name, stats in report["phases"].items():
+            if name != "build":
+                print(f"  {name:<10} {stats['wall']:>8.3f}s")
+        fills = report["fills"]
+        print(f"  fills: text {fills['text']['wall']:.3f}s ({fills['text']['calls']}), "
+              f"picture {fills['picture']['wall']:.3f}s ({fills['picture']['calls']})")
+        for name, stats in list(report["layouts"].items())[:3]:
+            print(f"  slowest layout: {name} {stats['wall']:.3f}s over {stats['calls']} slides")
+        print(f"  report: {path}" + (f", pstats: {self.stats_path}" if self.stats_path else ""))
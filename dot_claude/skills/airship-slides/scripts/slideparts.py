@@ -0,0 +1,261 @@
+"""
+Move rendered slides between presentations at the OPC part level.
+
+A slide "bundle" is a plain, picklable snapshot of one slide part plus every
+part it owns (pictures, charts, embedded workbooks, ...), with relationships
+recorded by rId and target partname. Layouts, masters and themes are not
+copied: they are referenced by partname and resolved in the destination,
+which must be built from the same template.
+
+generate.py uses bundles to ship slides rendered in worker processes back to
+the parent, and to splice cached slides into a deck without re-rendering.
+prune() strips the template parts a finished deck does not use.
+append_slide() adds a slide in constant time where python-pptx's
+add_slide() rescans every slide already in the deck; clone_slide() goes
+further and copies a per-layout skeleton with lxml instead of cloning the
+layout's placeholders one by one.
+"""
+
+import copy
+import hashlib
+import re
+import weakref
+
+from pptx.opc.constants import RELATIONSHIP_TARGET_MODE as RTM
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.package import PartFactory, _Relationship
+from pptx.opc.packuri import PackURI
+from pptx.parts.slide import SlidePart
+
+# Relationships into the template itself; their targets are shared, not copied.
+SHARED_RELTYPES = {
+    RT.SLIDE_LAYOUT,
+    RT.SLIDE_MASTER,
+    RT.NOTES_MASTER,
+    RT.HANDOUT_MASTER,
+    RT.THEME,
+}
+
+
+def slide_bundle(slide_part):
+    """Snapshot `slide_part` and the parts it owns as a picklable dict."""
+    parts = {}
+
+    def visit(part):
+        if part.partname in parts:
+            return
+        rels = []
+        parts[part.partname] = {"content_type": part.content_type, "blob": part.blob,
+                                "rels": rels}
+        for rId, rel in part.rels.items():
+            if rel.is_external:
+                rels.append((rId, rel.reltype, rel.target_ref, True))
+                continue
+            target = rel.target_part
+            rels.append((rId, rel.reltype, str(target.partname), False))
+            if rel.reltype not in SHARED_RELTYPES:
+                visit(target)
+
+    visit(slide_part)
+    return {"root": str(slide_part.partname),
+            "parts": {str(name): entry for name, entry in parts.items()}}
+
+
+# PresentationPart -> (next slide id, slide count it was computed for).
+_next_slide_ids = weakref.WeakKeyDictionary()
+MAX_SLIDE_ID = 2147483647
+
+
+def relate_slide(prs, slide_part):
+    """Relate `slide_part` to the presentation; returns its rId.
+
+    python-pptx's relate_to() first scans every relationship for one to the
+    same part, which a new slide never has.
+    """
+    rels = prs.part.rels
+    rId = rels._next_rId
+    rels._rels[rId] = _Relationship(rels._base_uri, rId, RT.SLIDE, RTM.INTERNAL, slide_part)
+    return rId
+
+
+def add_slide_id(prs, rId):
+    """Append a sldId for `rId` with the id python-pptx would pick (max + 1).
+
+    The next id is remembered per presentation instead of recomputed from
+    every existing sldId, and recomputed only if slides were added or
+    removed some other way.
+    """
+    sldIdLst = prs.slides._sldIdLst
+    count = len(sldIdLst)
+    next_id, seen = _next_slide_ids.get(prs.part, (None, None))
+    if seen != count or next_id > MAX_SLIDE_ID:
+        next_id = sldIdLst._next_id
+    sldIdLst._add_sldId(id=next_id, rId=rId)
+    _next_slide_ids[prs.part] = (next_id + 1, count + 1)
+
+
+def append_slide(prs, layout):
+    """prs.slides.add_slide(layout) in constant time; same parts, rIds and ids.
+
+    Building an n-slide deck with add_slide() is O(n^2): each call scans
+    every slide relationship and sldId, which dominates decks of thousands
+    of slides such as long paginated tables.
+    """
+    slide_part = SlidePart.new(prs.part._next_slide_partname, prs.part.package, layout.part)
+    rId = relate_slide(prs, slide_part)
+    slide = slide_part.slide
+    slide.shapes.clone_layout_placeholders(layout)
+    add_slide_id(prs, rId)
+    return slide
+
+
+# SlideLayoutPart -> (<p:sld> with the layout's placeholders, {idx: spTree position}).
+_skeletons = weakref.WeakKeyDictionary()
+
+
+def _skeleton(layout):
+    skeleton = _skeletons.get(layout.part)
+    if skeleton is None:
+        # A detached slide part: nothing relates to it, so it is never saved.
+        part = SlidePart.new(PackURI("/ppt/slides/skeleton.xml"), layout.part.package,
+                             layout.part)
+        part.slide.shapes.clone_layout_placeholders(layout)
+        sld = part._element
+        positions = {sp.ph_idx: i for i, sp in enumerate(sld.cSld.spTree)
+                     if sp.tag.endswith("}sp") and sp.has_ph_elm}
+        skeleton = _skeletons[layout.part] = (sld, positions)
+    return skeleton
+
+
+def clone_slide(prs, layout):
+    """append_slide() from a cached copy of the layout's blank slide.
+
+    The first slide on a layout is built as python-pptx would and kept as a
+    skeleton; later ones are a deepcopy of it, so the XML is identical.
+    Returns (slide part, {placeholder idx: <p:sp> element}) so callers can
+    write text straight into the placeholders.
+    """
+    sld, positions = _skeleton(layout)
+    element = copy.deepcopy(sld)
+    slide_part = SlidePart(PackURI(prs.part._next_slide_partname), CT.PML_SLIDE,
+                           prs.part.package, element)
+    slide_part.relate_to(layout.part, RT.SLIDE_LAYOUT)
+    add_slide_id(prs, relate_slide(prs, slide_part))
+    spTree = element.cSld.spTree
+    return slide_part, {idx: spTree[i] for idx, i in positions.items()}
+
+
+def _partname_template(partname):
+    """'/ppt/charts/chart7.xml' -> '/ppt/charts/chart%d.xml'."""
+    tmpl, n = re.subn(r"\d+(\.\w+)$", r"%d\1", partname)
+    return tmpl if n else re.sub(r"(\.\w+)$", r"%d\1", partname)
+
+
+class Splicer:
+    """Appends slide bundles to a presentation built from the same template."""
+
+    def __init__(self, prs):
+        self.prs = prs
+        self.package = prs.part.package
+        self._shared = {}
+        self._images = {}
+        for part in self.package.iter_parts():
+            self._shared[str(part.partname)] = part
+            if part.content_type.startswith("image/"):
+                self._images[hashlib.sha1(part.blob).hexdigest()] = part
+
+    def splice(self, bundle):
+        """Append the bundled slide to the end of the deck; returns its Slide."""
+        created = {}
+        slide_rId = None
+        root = bundle["root"]
+        parts = bundle["parts"]
+
+        def build(partname):
+            nonlocal slide_rId
+            if partname in created:
+                return created[partname]
+            entry = parts[partname]
+            if entry["content_type"].startswith("image/"):
+                part = created[partname] = self._image_part(partname, entry)
+                return part
+            if partname == root:
+                new_name = self.prs.part._next_slide_partname
+            else:
+                new_name = self.package.next_partname(_partname_template(partname))
+            part = PartFactory(PackURI(new_name), entry["content_type"], self.package,
+                               entry["blob"])
+            created[partname] = part
+            if partname == root:
+                # Attach first, so partnames picked for its children see it.
+                slide_rId = relate_slide(self.prs, part)
+            # Keep the original rIds so the XML that references them stays valid.
+            rels = part.rels
+            for rId, reltype, target, external in entry["rels"]:
+                if external:
+                    rels._rels[rId] = _Relationship(rels._base_uri, rId, reltype,
+                                                    RTM.EXTERNAL, target)
+                    continue
+                target_part = build(target) if target in parts else self._shared[target]
+                rels._rels[rId] = _Relationship(rels._base_uri, rId, reltype,
+                                                RTM.INTERNAL, target_part)
+            return part
+
+        slide_part = build(root)
+        add_slide_id(self.prs, slide_rId)
+        return slide_part.slide
+
+    def index_images(self, part):
+        """Make pictures that `part` gained outside splice() reusable by it."""
+        for rel in part.rels.values():
+            if not rel.is_external and rel.target_part.content_type.startswith("image/"):
+                target = rel.target_part
+                self._images.setdefault(hashlib.sha1(target.blob).hexdigest(), target)
+
+    def _image_part(self, partname, entry):
+        """Reuse an identical picture already in the deck, or add this one."""
+        blob = entry["blob"]
+        sha1 = hashlib.sha1(blob).hexdigest()
+        part = self._images.get(sha1)
+        if part is None:
+            ext = partname.rsplit(".", 1)[-1]
+            part = PartFactory(self.package.next_image_partname(ext), entry["content_type"],
+                               self.package, blob)
+            self._images[sha1] = part
+        return part
+
+
+def prune(prs):
+    """Drop layouts that no slide uses, then masters left without layouts.
+
+    python-pptx only saves parts reachable from the package relationships,
+    so dropping the master -> layout relationships also leaves out the
+    layouts' background pictures and anything else only they referenced.
+    Returns (layouts removed, parts removed, uncompressed bytes of the parts
+    removed).
+    """
+    package = prs.part.package
+    before = {str(part.partname): part for part in package.iter_parts()}
+    used = {slide.part.part_related_by(RT.SLIDE_LAYOUT) for slide in prs.slides}
+
+    layouts_removed = 0
+    for master in prs.slide_masters:
+        id_lst = master.slide_layouts._sldLayoutIdLst
+        for sldLayoutId in list(id_lst.sldLayoutId_lst):
+            if master.part.related_part(sldLayoutId.rId) not in used:
+                id_lst.remove(sldLayoutId)
+                master.part.drop_rel(sldLayoutId.rId)
+                layouts_removed += 1
+
+    # A presentation needs at least one master, even if it has no slides.
+    master_lst = prs.slide_masters._sldMasterIdLst
+    for sldMasterId in list(master_lst.sldMasterId_lst):
+        master = prs.part.related_slide_master(sldMasterId.rId)
+        if len(master.slide_layouts) == 0 and len(master_lst.sldMasterId_lst) > 1:
+            master_lst.remove(sldMasterId)
+            prs.part.drop_rel(sldMasterId.rId)
+
+    after = {str(part.partname) for part in package.iter_parts()}
+    removed = [part for name, part in before.items() if name not in after]
+    return layouts_removed, len(removed), sum(len(part.blob) for part in removed)
@@ -0,0 +1,220 @@
+"""
+Paginated tables from CSV files or inline rows.
+
+A slide's "table" field holds either a CSV path or inline rows:
+
+    {"csv": "export.csv", "columns": ["id", "name", "status"], "font_size": 9}
+    {"header": ["Plan", "Price"], "rows": [["Free", "$0"], ["Pro", "$20"]]}
+
+paginate() expands such a slide into as many slides as its rows need,
+repeating the header row on each and suffixing continuation titles with
+" (cont.)". The CSV is read as a stream, one page of rows at a time, so a
+50k-row export never sits in memory whole. Rows per slide come from
+estimated row heights: column widths are fixed from the header and the
+first SAMPLE_ROWS rows, and each cell's wrapped line count is estimated
+from its length (memoized, since exports repeat values a lot). Set
+"rows_per_slide" to paginate by count instead.
+
+add_table() draws one page of rows as a native PowerPoint table.
+"""
+
+import csv
+import functools
+import itertools
+import math
+import os
+import re
+from xml.sax.saxutils import escape
+
+SAMPLE_ROWS = 100
+DEFAULT_FONT_SIZE = 10
+LINE_SPACING = 1.2
+# Average glyph advance as a fraction of the font size, and python-pptx's
+# default cell margins (0.1" left/right, 0.05" top/bottom) in points.
+CHAR_WIDTH = 0.5
+CELL_MARGIN_X = 14.4
+CELL_MARGIN_Y = 7.2
+# Widest a column can claim, in characters, when sharing the table width.
+MAX_COLUMN_CHARS = 40
+
+_NS_A = "http://schemas.openxmlformats.org/drawingml/2006/main"
+
+SPEC_FIELDS = ("csv", "header", "rows", "columns", "font_size", "rows_per_slide", "box")
+
+
+@functools.lru_cache(maxsize=65536)
+def text_lines(text, chars_per_line):
+    """Estimated wrapped line count of `text` in a column `chars_per_line` wide."""
+    return sum(max(1, math.ceil(len(line) / chars_per_line)) for line in text.split("\n"))
+
+
+def column_widths(header, sample, total):
+    """Split `total` inches across columns in proportion to their sampled text length."""
+    weights = []
+    for i, name in enumerate(header):
+        lengths = [len(name)] + [len(row[i]) for row in sample if i < len(row)]
+        weights.append(min(MAX_COLUMN_CHARS, max(4, sum(lengths) / len(lengths))))
+    scale = total / sum(weights)
+    return [round(w * scale, 3) for w in weights]
+
+
+class _Layout:
+    """Row-height estimates for one table's column widths and font size."""
+
+    def __init__(self, widths, font_size):
+        self.font_size = font_size
+        self.line = font_size * LINE_SPACING
+        self.chars = [max(1, int((w * 72 - CELL_MARGIN_X) / (font_size * CHAR_WIDTH)))
+                      for w in widths]
+
+    def row_height(self, row):
+        """Estimated height of `row` in points."""
+        lines = max((text_lines(text, chars) for text, chars in zip(row, self.chars)),
+                    default=1)
+        return lines * self.line + CELL_MARGIN_Y
+
+
+def _source(spec):
+    """(header, iterator over rows, closer) for a table spec."""
+    columns = spec.get("columns")
+    if spec.get("csv"):
+        f = open(spec["csv"], newline="", encoding="utf-8")
+        reader = csv.reader(f)
+        header = next(reader, [])
+        rows, close = reader, f.close
+    else:
+        header = list(spec.get("header") or [])
+        rows, close = iter(spec.get("rows") or []), lambda: None
+    header = [str(name) for name in header]
+    rows = ([("" if v is None else str(v)) for v in row] for row in rows)
+    if columns:
+        missing = [name for name in columns if name not in header]
+        if missing:
+            close()
+            raise ValueError(f"no column {', '.join(map(repr, missing))} "
+                             f"(columns: {', '.join(header)})")
+        picks = [header.index(name) for name in columns]
+        header = list(columns)
+        rows = ([row[i] if i < len(row) else "" for i in picks] for row in rows)
+    return header, rows, close
+
+
+def paginate(slide_data, area):
+    """Yield one slide dict per page of `slide_data`'s table.
+
+    `area` is the table's (left, top, width, height) in inches unless the
+    spec's "box" overrides it. Each yielded slide carries a "table" with the
+    page's "header" and "rows", the fixed column "widths" and the estimated
+    row "heights", ready for add_table().
+    """
+    spec = slide_data["table"]
+    box = list(spec.get("box") or area)
+    font_size = spec.get("font_size") or DEFAULT_FONT_SIZE
+    per_slide = spec.get("rows_per_slide")
+    header, source, close = _source(spec)
+    try:
+        sample = list(itertools.islice(source, SAMPLE_ROWS))
+        widths = column_widths(header, sample, box[2]) if header else []
+        layout = _Layout(widths, font_size)
+        header_height = layout.row_height(header)
+        available = box[3] * 72 - header_height
+        title = slide_data.get("title", "")
+
+        def page():
+            return {**slide_data, "title": f"{title} (cont.)" if n and title else title,
+                    "table": {"header": header, "rows": rows, "widths": widths,
+                              "heights": [header_height, *heights], "font_size": font_size,
+                              "box": box}}
+
+        rows, heights, used, n = [], [], 0.0, 0
+        for row in itertools.chain(sample, source):
+            height = layout.row_height(row)
+            full = len(rows) >= per_slide if per_slide else used + height > available
+            if rows and full:
+                yield page()
+                rows, heights, used, n = [], [], 0.0, n + 1
+            rows.append(row)
+            heights.append(height)
+            used += height
+        if rows or n == 0:
+            yield page()
+    finally:
+        close()
+
+
+def check_spec(spec, where, asset_exists=os.path.exists):
+    """Errors in a table spec, each prefixed with `where`."""
+    if not isinstance(spec, dict):
+        return [f"{where}: expected an object, got {type(spec).__name__}"]
+    errors = []
+    for key in spec:
+        if key not in SPEC_FIELDS:
+            errors.append(f"{where}: unknown field '{key}' (allowed: {', '.join(SPEC_FIELDS)})")
+    if spec.get("csv") is not None:
+        if "rows" in spec or "header" in spec:
+            errors.append(f"{where}: give either csv or header/rows, not both")
+        if not isinstance(spec["csv"], str):
+            errors.append(f"{where}.csv: expected a file path")
+        elif not asset_exists(spec["csv"]):
+            errors.append(f"{where}: file not found: {spec['csv']}")
+    elif not isinstance(spec.get("header"), list) or not isinstance(spec.get("rows"), list):
+        errors.append(f"{where}: give csv, or header and rows lists")
+    elif not all(isinstance(row, list) for row in spec["rows"]):
+        errors.append(f"{where}.rows: expected a list of lists")
+    columns = spec.get("columns")
+    if columns is not None and (not isinstance(columns, list)
+                                or not all(isinstance(c, str) for c in columns)):
+        errors.append(f"{where}.columns: expected a list of column names")
+    for key in ("font_size", "rows_per_slide"):
+        value = spec.get(key)
+        if value is not None and (not isinstance(value, (int, float)) or value <= 0):
+            errors.append(f"{where}.{key}: expected a positive number")
+    box = spec.get("box")
+    if box is not None and (not isinstance(box, list) or len(box) != 4
+                            or not all(isinstance(v, (int, float)) for v in box)):
+        errors.append(f"{where}.box: expected [left, top, width, height] in inches")
+    return errors
+
+
+# Characters XML 1.0 cannot carry; dropped from cell text.
+_INVALID_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _cell_xml(text, rpr):
+    paragraphs = "".join(
+        f"<a:p><a:r>{rpr}<a:t>{escape(line)}</a:t></a:r></a:p>" if line else
+        f"<a:p>{rpr.replace('a:rPr', 'a:endParaRPr')}</a:p>"
+        for line in _INVALID_XML.sub("", text).split("\n"))
+    return f"<a:tc><a:txBody><a:bodyPr/><a:lstStyle/>{paragraphs}</a:txBody><a:tcPr/></a:tc>"
+
+
+def add_table(slide, spec):
+    """Draw one paginated table page (see paginate()) on `slide`.
+
+    The rows are parsed as a single XML fragment rather than filled cell by
+    cell through python-pptx, which is several times faster on large pages.
+    """
+    from pptx.oxml import parse_xml
+    from pptx.util import Inches, Pt
+
+    header, rows, widths = spec["header"], spec["rows"], spec["widths"]
+    heights, font_size = spec["heights"], spec["font_size"]
+    left, top, width, _ = spec["box"]
+    frame = slide.shapes.add_table(1, len(header), Inches(left), Inches(top),
+                                   Inches(width), Pt(sum(heights)))
+    tbl = frame.table._tbl
+    for grid_col, w in zip(tbl.tblGrid.gridCol_lst, widths):
+        grid_col.w = Inches(w)
+    for tr in tbl.tr_lst:
+        tbl.remove(tr)
+
+    rpr = f'<a:rPr lang="en-US" sz="{round(font_size * 100)}"/>'
+    ncols = len(header)
+    trs = "".join(
+        f'<a:tr h="{Pt(height)}">'
+        + "".join(_cell_xml(text, rpr) for text in (row + [""] * ncols)[:ncols])
+        + "</a:tr>"
+        for row, height in zip([header, *rows], heights))
+    fragment = parse_xml(f'<a:tbl xmlns:a="{_NS_A}">{trs}</a:tbl>')
+    tbl.extend(list(fragment))
+    return frame
@@ -0,0 +1,437 @@
+"""
+Fit slide text to its placeholders before rendering.
+
+compile_plan() records, for every text placeholder, its box, insets,
+inherited font size and typeface (placeholder_style()). Fitter measures
+each field's text against that: paragraphs are word-wrapped greedily with
+the typeface's glyph advances, and the wrapped height is compared with the
+box. Text that overflows is, depending on the fit policy:
+
+    shrink  set to the largest size that fits, down to MIN_SCALE of the
+            template size (never below MIN_SIZE points)
+    split   a slide's "body" continues on copies of the slide titled
+            "<title> (cont.)"; other fields shrink
+    none    left alone
+
+Glyph advances come from the template's font files, read with fontTools
+when it is installed and the font is found in FONT_DIRS, and otherwise from
+built-in Helvetica-like widths, which err wide: text measured with those
+only counts as overflowing when it is more than FALLBACK_MARGIN too wide,
+and Fitter warns once per font. Each font's advance table
+is extracted once and cached on disk as a flat array of 1/1000 em widths
+for the Basic Multilingual Plane; a field's words are measured in one
+batch over that array (with NumPy when available).
+"""
+
+import array
+import functools
+import hashlib
+import math
+import os
+import re
+
+FIT_POLICIES = ("shrink", "split", "none")
+MIN_SCALE = 0.5
+MIN_SIZE = 8
+LINE_SPACING = 1.2
+METRICS_VERSION = 1
+# Share of the built-in widths discounted before fitting, since they err wide.
+FALLBACK_MARGIN = 0.15
+
+# python-pptx/PowerPoint defaults for bodyPr insets (left, top, right, bottom), EMU.
+DEFAULT_INSETS = (91440, 45720, 91440, 45720)
+EMU_PER_PT = 12700
+
+FONT_DIRS = [
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "fonts"),
+    os.path.expanduser("~/.fonts"),
+    os.path.expanduser("~/.local/share/fonts"),
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+    os.path.expanduser("~/Library/Fonts"),
+    "/Library/Fonts",
+    "/System/Library/Fonts",
+    os.path.join(os.environ.get("WINDIR", "C:\\Windows"), "Fonts"),
+]
+
+# Helvetica advances for ASCII 32-126 in 1/1000 em.
+_ASCII_WIDTHS = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+# Full-width ranges (CJK, Hangul, full-width forms) measured as 1 em.
+_WIDE_RANGES = ((0x1100, 0x115F), (0x2E80, 0xA4CF), (0xAC00, 0xD7A3), (0xF900, 0xFAFF),
+                (0xFE30, 0xFE4F), (0xFF00, 0xFF60), (0xFFE0, 0xFFE6))
+_DEFAULT_WIDTH = 556
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+# -- Template styles ---------------------------------------------------------
+
+_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+
+
+def _first_attr(element, paths, attr):
+    for path in paths:
+        for found in element.iterfind(path):
+            value = found.get(attr)
+            if value is not None:
+                return value
+    return None
+
+
+_SIZE_PATHS = (f".//{_A}lstStyle/{_A}lvl1pPr/{_A}defRPr", f".//{_A}rPr", f".//{_A}endParaRPr")
+_FACE_PATHS = tuple(f"{path}/{_A}latin" for path in _SIZE_PATHS)
+
+
+def theme_fonts(master):
+    """(major, minor) latin typefaces of a slide master's theme."""
+    from lxml import etree
+    from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+
+    theme = etree.fromstring(master.part.part_related_by(RT.THEME).blob)
+    major = theme.find(f".//{_A}majorFont/{_A}latin")
+    minor = theme.find(f".//{_A}minorFont/{_A}latin")
+    return (major.get("typeface") if major is not None else None,
+            minor.get("typeface") if minor is not None else None)
+
+
+def placeholder_style(ph, fonts):
+    """Box, insets, font size and typeface a layout placeholder's text inherits.
+
+    Looks at the layout placeholder, then the master placeholder it inherits
+    from, then the master's title or body text style. Returns a JSON-ready
+    {"box": [cx, cy], "insets": [l, t, r, b], "size": centipoints,
+    "font": typeface}.
+    """
+    from pptx.enum.shapes import PP_PLACEHOLDER
+
+    title = ph.placeholder_format.type in (PP_PLACEHOLDER.TITLE, PP_PLACEHOLDER.CENTER_TITLE)
+    master = ph.part.slide_master
+    chain = [ph._element]
+    base = ph._base_placeholder
+    if base is not None:
+        chain.append(base._element)
+    styles = master._element.find(
+        "{http://schemas.openxmlformats.org/presentationml/2006/main}txStyles")
+    if styles is not None:
+        style = styles.find("{http://schemas.openxmlformats.org/presentationml/2006/main}"
+                            + ("titleStyle" if title else "bodyStyle"))
+        if style is not None:
+            chain.append(style)
+
+    size = face = None
+    for element in chain:
+        size = size or _first_attr(element, _SIZE_PATHS, "sz")
+        face = face or _first_attr(element, _FACE_PATHS, "typeface")
+    insets = []
+    for attr, default in zip(("lIns", "tIns", "rIns", "bIns"), DEFAULT_INSETS):
+        value = _first_attr(ph._element, (f".//{_A}bodyPr",), attr)
+        if value is None and base is not None:
+            value = _first_attr(base._element, (f".//{_A}bodyPr",), attr)
+        insets.append(int(value) if value is not None else default)
+
+    major, minor = fonts
+    if face in (None, "+mj-lt", "+mn-lt"):
+        face = major if face == "+mj-lt" or (face is None and title) else minor
+    return {"box": [ph.width, ph.height], "insets": insets,
+            "size": int(size) if size else 1800, "font": face}
+
+
+# -- Font metrics ------------------------------------------------------------
+
+def _normalize(name):
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+@functools.lru_cache(maxsize=None)
+def _font_files():
+    files = []
+    for root in FONT_DIRS:
+        for dirpath, _, names in os.walk(root):
+            files += [os.path.join(dirpath, name) for name in names
+                      if name.lower().endswith((".ttf", ".otf"))]
+    return files
+
+
+def find_font(family):
+    """Path of the regular face of `family` in FONT_DIRS, or None."""
+    if not family:
+        return None
+    key = _normalize(family)
+    best = None
+    for path in _font_files():
+        stem = _normalize(os.path.splitext(os.path.basename(path))[0])
+        if not stem.startswith(key):
+            continue
+        style = stem[len(key):]
+        rank = 0 if style in ("", "regular", "book", "roman") else 1 if "regular" in style else 2
+        if best is None or rank < best[0]:
+            best = (rank, path)
+    return best[1] if best else None
+
+
+def _fallback_advances():
+    advances = array.array("H", [_DEFAULT_WIDTH]) * 65536
+    advances[32:127] = array.array("H", _ASCII_WIDTHS)
+    for lo, hi in _WIDE_RANGES:
+        advances[lo:hi + 1] = array.array("H", [1000]) * (hi + 1 - lo)
+    return advances
+
+
+def _font_advances(path):
+    from fontTools.ttLib import TTFont
+
+    with TTFont(path, lazy=True, fontNumber=0) as font:
+        upem = font["head"].unitsPerEm
+        hmtx = font["hmtx"].metrics
+        advances = _fallback_advances()
+        for cp, glyph in font.getBestCmap().items():
+            if cp < 65536 and glyph in hmtx:
+                advances[cp] = min(65535, round(hmtx[glyph][0] * 1000 / upem))
+    return advances
+
+
+class FontMetrics:
+    """Glyph advances of one font for the BMP, in 1/1000 em."""
+
+    def __init__(self, name, advances, builtin=False):
+        self.name = name
+        self.advances = advances
+        self.builtin = builtin
+        np = _numpy()
+        self._np = np
+        self._array = np.frombuffer(advances, dtype=np.uint16) if np else None
+        self.space = advances[32]
+
+    def word_widths(self, words):
+        """Widths of `words` in 1/1000 em, measured as one batch."""
+        np = self._np
+        if np is None or not words:
+            adv = self.advances
+            return [sum(adv[c] if c < 65536 else _DEFAULT_WIDTH for c in map(ord, word))
+                    for word in words]
+        codes = np.frombuffer("".join(words).encode("utf-32-le"), dtype=np.uint32)
+        widths = np.where(codes < 65536, self._array[np.minimum(codes, 65535)],
+                          _DEFAULT_WIDTH).astype(np.int64)
+        lengths = np.fromiter(map(len, words), dtype=np.int64, count=len(words))
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        sums = np.add.reduceat(widths, starts) if len(widths) else np.zeros(len(words))
+        # reduceat returns the element itself for empty words; zero those.
+        return np.where(lengths > 0, sums, 0).tolist()
+
+
+_metrics = {}
+
+
+def load_metrics(family, cache_root):
+    """FontMetrics for `family`, from the disk cache when it has been read before."""
+    if family in _metrics:
+        return _metrics[family]
+    path = find_font(family)
+    advances = None
+    if path:
+        st = os.stat(path)
+        key = hashlib.sha256(f"{METRICS_VERSION}:{path}:{st.st_mtime_ns}:{st.st_size}"
+                             .encode()).hexdigest()[:32]
+        cached = os.path.join(cache_root, key + ".bin")
+        try:
+            with open(cached, "rb") as f:
+                advances = array.array("H")
+                advances.frombytes(f.read())
+        except OSError:
+            try:
+                advances = _font_advances(path)
+            except Exception:
+                advances = None  # fontTools missing or unreadable font
+            else:
+                tmp = f"{cached}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(advances.tobytes())
+                os.replace(tmp, cached)
+    if advances is None or len(advances) != 65536:
+        path, advances = None, _fallback_advances()
+    metrics = _metrics[family] = FontMetrics(path or "builtin", advances, builtin=path is None)
+    return metrics
+
+
+# -- Measuring and fitting ---------------------------------------------------
+
+def _paragraph_words(text):
+    return [paragraph.split() for paragraph in text.replace("\v", "\n").split("\n")]
+
+
+def count_lines(paragraphs, space, width):
+    """Lines needed for paragraphs of word widths wrapped to `width` (same units)."""
+    lines = 0
+    for words in paragraphs:
+        lines += 1
+        line = None
+        for w in words:
+            if line is None:
+                line = w
+            elif line + space + w <= width:
+                line += space + w
+                continue
+            else:
+                lines += 1
+                line = w
+            if w > width:  # a word wider than the box breaks across lines
+                extra = math.ceil(w / width) - 1
+                lines += extra
+                line = w - extra * width
+    return lines
+
+
+def _value(slide_data, path):
+    value = slide_data
+    for key in path:
+        if isinstance(key, int):
+            value = value[key] if isinstance(value, list) and key < len(value) else None
+        else:
+            value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+
+class Fitter:
+    """Fits slide text to the placeholders in a compiled fill plan."""
+
+    def __init__(self, cache_root, policy="shrink", verbose=True):
+        self.cache_root = cache_root
+        self.policy = policy
+        self.verbose = verbose
+        self.shrunk = self.continued = 0
+        self._warned = set()
+
+    def _measure(self, text, style):
+        """(paragraphs, word widths per paragraph, space width) in `style`'s font."""
+        metrics = load_metrics(style["font"], self.cache_root)
+        paragraphs = _paragraph_words(text)
+        flat = metrics.word_widths([w for words in paragraphs for w in words])
+        space = metrics.space
+        if metrics.builtin:
+            if self.verbose and style["font"] not in self._warned:
+                self._warned.add(style["font"])
+                print(f"  Warning: no metrics for font {style['font']!r} (needs fontTools and "
+                      f"the font file); fitting with built-in widths less "
+                      f"{FALLBACK_MARGIN:.0%}")
+            flat = [w * (1 - FALLBACK_MARGIN) for w in flat]
+            space *= 1 - FALLBACK_MARGIN
+        widths, i = [], 0
+        for words in paragraphs:
+            widths.append(flat[i:i + len(words)])
+            i += len(words)
+        return paragraphs, widths, space
+
+    @staticmethod
+    def _fits(widths, space, style, size):
+        """Whether text of these word widths fits `style`'s box at `size` centipoints."""
+        left, top, right, bottom = style["insets"]
+        cx, cy = style["box"]
+        em = size / 100 * EMU_PER_PT  # EMU per em at this size
+        width = (cx - left - right) / em * 1000
+        if width <= 0:
+            return True
+        return count_lines(widths, space, width) * em * LINE_SPACING <= cy - top - bottom
+
+    def fit_size(self, text, style):
+        """The size (centipoints) `text` should be set at, or None if it fits."""
+        _, widths, space = self._measure(text, style)
+        size = style["size"]
+        if self._fits(widths, space, style, size):
+            return None
+        # Largest half-point size that fits, by binary search; the floor if none does.
+        lo = max(MIN_SIZE * 100, int(size * MIN_SCALE)) // 50
+        hi = size // 50 - 1
+        best = lo
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            if self._fits(widths, space, style, mid * 50):
+                best, lo = mid, mid + 1
+            else:
+                hi = mid - 1
+        return best * 50
+
+    def split_text(self, text, style):
+        """(head, tail): as much of `text` as fits `style`'s box, and the rest."""
+        paragraphs, widths, space = self._measure(text, style)
+        size = style["size"]
+        if self._fits(widths, space, style, size):
+            return text, ""
+        kept = 0
+        while self._fits(widths[:kept + 1], space, style, size):
+            kept += 1
+        if kept:
+            return ("\n".join(" ".join(p) for p in paragraphs[:kept]),
+                    "\n".join(" ".join(p) for p in paragraphs[kept:]))
+        # The first paragraph alone overflows: split it between words.
+        words, first = paragraphs[0], widths[0]
+        lo, hi = 0, len(words) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self._fits([first[:mid]], space, style, size):
+                lo = mid
+            else:
+                hi = mid - 1
+        rest = [" ".join(words[lo:])] + [" ".join(p) for p in paragraphs[1:]]
+        return " ".join(words[:lo]), "\n".join(rest)
+
+    def fit(self, slide_data, entry):
+        """Yield `slide_data` fitted to `entry`'s placeholders (several if split).
+
+        Shrunk fields are recorded in the slide's "_font_sizes" as
+        {"dotted.path": centipoints}, which fill_slide() applies.
+        """
+        policy = slide_data.get("fit", self.policy)
+        styles = entry.get("text")
+        if policy == "none" or not styles:
+            yield slide_data
+            return
+        pages = self._continue_body(slide_data, entry, styles) if policy == "split" else \
+            [slide_data]
+        for page in pages:
+            yield self._shrink(page, entry, styles)
+
+    def _continue_body(self, slide_data, entry, styles):
+        """Yield the slide, then continuation slides for body text that overflows."""
+        idx = next((idx for path, idx, kind, _, _ in entry["fills"] if path == ["body"]), None)
+        style = styles.get(str(idx))
+        body = slide_data.get("body")
+        title = slide_data.get("title", "")
+        while style is not None and isinstance(body, str):
+            head, tail = self.split_text(body, style)
+            if not head.strip() or not tail.strip():
+                break
+            self.continued += 1
+            yield {**slide_data, "body": head}
+            if title and not title.endswith(" (cont.)"):
+                title = f"{title} (cont.)"
+            slide_data = {**slide_data, "body": tail, "title": title}
+            body = tail
+        yield slide_data
+
+    def _shrink(self, slide_data, entry, styles):
+        sizes = {}
+        for path, idx, kind, _, _ in entry["fills"]:
+            style = styles.get(str(idx))
+            value = _value(slide_data, path) if kind == "text" and style else None
+            if not isinstance(value, str) or not value.strip():
+                continue
+            size = self.fit_size(value, style)
+            if size is not None:
+                self.shrunk += 1
+                sizes[".".join(map(str, path))] = size
+        if not sizes:
+            return slide_data
+        return {**slide_data, "_font_sizes": {**slide_data.get("_font_sizes", {}), **sizes}}
@@ -0,0 +1,156 @@
+"""
+File watchers for generate.py --watch.
+
+InotifyWatcher uses Linux inotify through ctypes (no extra packages) and
+watches the parent directory of every file, so editors that save by writing
+a temp file and renaming it over the original are still noticed. Elsewhere
+(macOS) make_watcher() falls back to PollingWatcher, which compares stat
+results on an interval.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+# <sys/inotify.h>
+IN_MODIFY = 0x002
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class PollingWatcher:
+    """Detects changes by re-stat()ing every watched file."""
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self._stats = {}
+
+    @staticmethod
+    def _stat(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def watch(self, paths):
+        """Replace the set of watched files."""
+        self._stats = {os.path.abspath(p): self._stat(p) for p in paths}
+
+    def wait(self, timeout=None):
+        """Block until a watched file changes; returns the changed paths.
+
+        Returns an empty set if `timeout` seconds pass first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = set()
+            for path, old in self._stats.items():
+                new = self._stat(path)
+                if new != old:
+                    self._stats[path] = new
+                    changed.add(path)
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self.interval if deadline is None
+                       else min(self.interval, max(0.0, deadline - time.monotonic())))
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Detects changes through inotify events on the files' directories."""
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs = {}  # wd -> directory
+        self._paths = set()
+
+    def watch(self, paths):
+        """Replace the set of watched files."""
+        self._paths = {os.path.abspath(p) for p in paths}
+        wanted = {os.path.dirname(p) for p in self._paths}
+        for wd, directory in list(self._dirs.items()):
+            if directory not in wanted:
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._dirs[wd]
+        for directory in wanted - set(self._dirs.values()):
+            wd = self._libc.inotify_add_watch(self._fd, directory.encode(), IN_MASK)
+            if wd >= 0:
+                self._dirs[wd] = directory
+
+    def _read_events(self):
+        changed = set()
+        try:
+            buf = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(buf):
+            wd, _, _, length = EVENT_HEADER.unpack_from(buf, offset)
+            offset += EVENT_HEADER.size
+            name = buf[offset:offset + length].rstrip(b"\0").decode(errors="surrogateescape")
+            offset += length
+            path = os.path.join(self._dirs.get(wd, ""), name)
+            if path in self._paths:
+                changed.add(path)
+        return changed
+
+    def wait(self, timeout=None):
+        """Block until a watched file changes; returns the changed paths.
+
+        Returns an empty set if `timeout` seconds pass first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if ready:
+                changed = self._read_events()
+                if changed:
+                    return changed
+            elif deadline is not None:
+                return set()
+
+    def close(self):
+        os.close(self._fd)
+
+
+def make_watcher(poll_interval=0.5):
+    """inotify where available, stat polling everywhere else."""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(poll_interval)
+
+
+def wait_for_changes(watcher, debounce=0.3):
+    """Wait for a change, then keep collecting until `debounce` seconds pass quietly.
+
+    Editors often write a file several times in a row; this turns a burst
+    of events into a single rebuild.
+    """
+    changed = watcher.wait()
+    while True:
+        more = watcher.wait(timeout=debounce)
+        if not more:
+            return changed
+        changed |= more
@@ -0,0 +1,64 @@
+"""
+Write a presentation's OPC package straight into a zip stream.
+
+python-pptx's Presentation.save() deflates every member, including JPEG/PNG
+media that are already compressed. write_package() writes the same members
+in the same order, but stores already-compressed media as-is and lets the
+deflate level for XML be chosen. Parts are serialized and written one at a
+time, so peak memory stays around the size of the largest part. The target
+may be a path, a binary file object (unseekable ones such as stdout work)
+or a raw file descriptor.
+"""
+
+import contextlib
+import os
+import time
+import zipfile
+
+from pptx.opc.oxml import serialize_part_xml
+from pptx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+from pptx.opc.serialized import _ContentTypesItem
+
+# Extensions of formats that are compressed already; deflating them again
+# costs CPU and saves next to nothing.
+STORED_EXTENSIONS = frozenset({
+    "jpg", "jpeg", "png", "gif", "webp", "wdp", "emz", "wmz",
+    "mp3", "m4a", "mp4", "m4v", "mov", "wma", "wmv",
+    "zip", "xlsx", "docx", "pptx",
+})
+
+DEFAULT_XML_LEVEL = 6
+
+
+def write_package(prs, target, xml_level=None, stored=STORED_EXTENSIONS):
+    """Write `prs` as a .pptx to `target` (path, binary file object or fd).
+
+    `xml_level` is the deflate level (1-9) for XML and everything else not
+    in `stored`; 0 stores those uncompressed as well.
+    """
+    if xml_level is None:
+        xml_level = DEFAULT_XML_LEVEL
+    package = prs.part.package
+    parts = tuple(package.iter_parts())
+    date_time = time.localtime()[:6]
+
+    with contextlib.ExitStack() as stack:
+        if isinstance(target, int):
+            target = stack.enter_context(os.fdopen(target, "wb", closefd=False))
+        zf = stack.enter_context(zipfile.ZipFile(target, "w", strict_timestamps=False))
+
+        def write(pack_uri, blob):
+            info = zipfile.ZipInfo(pack_uri.membername, date_time)
+            info.external_attr = 0o600 << 16
+            if xml_level == 0 or pack_uri.ext.lower() in stored:
+                zf.writestr(info, blob, compress_type=zipfile.ZIP_STORED)
+            else:
+                zf.writestr(info, blob, compress_type=zipfile.ZIP_DEFLATED,
+                            compresslevel=xml_level)
+
+        write(CONTENT_TYPES_URI, serialize_part_xml(_ContentTypesItem.xml_for(parts)))
+        write(PACKAGE_URI.rels_uri, package._rels.xml)
+        for part in parts:
+            write(part.partname, part.blob)
+            if part._rels:
+                write(part.partname.rels_uri, part.rels.xml)
@@ -0,0 +1,281 @@
+"""
+Near-duplicate colors in Xcode asset catalogs.
+
+load_catalog() reads every *.colorset/Contents.json under a catalog into one
+array (read on a thread pool), and ColorIndex finds colors closer than a
+ΔE threshold. Distances are OKLab ΔE scaled by 100, so 1 is about one
+just-noticeable difference; two colorsets count as near-duplicates when
+both their light and their dark appearances are that close. Candidate pairs
+come from a k-d tree over (light, dark) as one 6-D point (scipy, when
+installed) or from a uniform grid over the light colors with cells the size
+of the threshold, so neither compares all pairs. Near-duplicates are
+reported as clusters around a center color, every member within the
+threshold of it (matches chain, so grouping everything connected would
+join colors far apart), or with --pairs as every matching pair.
+
+    python3 colorindex.py Assets.xcassets [--max-delta-e 2] [--pairs]
+
+mcolors.py --max-delta-e checks an incoming palette against a catalog the
+same way before writing anything.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import palette
+
+DEFAULT_MAX_DELTA_E = 2.0
+
+
+# sRGB 0-1 floats from a colorset's component strings, which Xcode writes
+# as "0.933", "0xEE" or "238"
+def _component(value):
+    if isinstance(value, str):
+        value = int(value, 16) if value.lower().startswith("0x") else float(value)
+        return value / 255 if value > 1 else value
+    return value / 255 if value > 1 else float(value)
+
+
+# (light, dark) sRGB triples of one Contents.json; dark falls back to light,
+# and None for system/platform colors, which have no components
+def _appearances(path):
+    with open(path, "rb") as f:
+        contents = json.load(f)
+    light = dark = None
+    for entry in contents.get("colors", []):
+        components = entry.get("color", {}).get("components")
+        if not components:
+            continue
+        rgb = tuple(_component(components[key]) for key in ("red", "green", "blue"))
+        appearances = {(a.get("appearance"), a.get("value")) for a in entry.get("appearances", [])}
+        if ("luminosity", "dark") in appearances:
+            dark = dark or rgb
+        elif not appearances or ("luminosity", "light") in appearances:
+            light = light or rgb
+    if light is None:
+        return None
+    return light, dark or light
+
+
+# Every colorset under root: (names, sRGB array of shape (n, 2, 3) with the
+# light and dark appearance). Names are colorset paths relative to root,
+# without the .colorset suffix.
+def load_catalog(root, jobs=None):
+    paths = []
+    for folder, dirs, files in os.walk(root):
+        if folder.endswith(".colorset"):
+            dirs[:] = []
+            if "Contents.json" in files:
+                paths.append(os.path.join(folder, "Contents.json"))
+
+    def load(path):
+        try:
+            return _appearances(path)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+    with ThreadPoolExecutor(max_workers=jobs or min(32, (os.cpu_count() or 1) * 4)) as pool:
+        loaded = list(pool.map(load, paths))
+    names, colors = [], []
+    for path, color in zip(paths, loaded):
+        if color is not None:
+            names.append(os.path.relpath(os.path.dirname(path), root)[:-len(".colorset")])
+            colors.append(color)
+    return names, np.array(colors, dtype=float).reshape(-1, 2, 3)
+
+
+# OKLab ×100 of an sRGB 0-1 array (any leading shape)
+def to_lab(rgb):
+    return palette.linear_to_oklab(palette.srgb_to_linear(np.asarray(rgb, dtype=float))) * 100
+
+
+# ΔE of (light, dark) lab pairs: the larger of the two appearances' distances
+def _delta_e(a, b):
+    return np.linalg.norm(a - b, axis=-1).max(axis=-1)
+
+
+# Pairs (i, j) of queries and points (both (n, 2, 3) lab) within ΔE r, from a
+# uniform grid over the light colors with r-sized cells: each query is only
+# compared with the points in its own and the 26 neighbouring cells
+def _grid_pairs(points, queries, r):
+    points, queries, full_points, full_queries = points[:, 0], queries[:, 0], points, queries
+    origin = np.minimum(points.min(axis=0), queries.min(axis=0))
+    cells = np.floor((points - origin) / r).astype(np.int64) + 1
+    query_cells = np.floor((queries - origin) / r).astype(np.int64) + 1
+    dims = np.maximum(cells.max(axis=0), query_cells.max(axis=0)) + 2
+
+    def key(c):
+        return (c[:, 0] * dims[1] + c[:, 1]) * dims[2] + c[:, 2]
+
+    order = np.argsort(key(cells), kind="stable")
+    sorted_keys = key(cells)[order]
+    found_i, found_j = [], []
+    for offset in itertools.product((-1, 0, 1), repeat=3):
+        keys = key(query_cells + offset)
+        lo = np.searchsorted(sorted_keys, keys, "left")
+        counts = np.searchsorted(sorted_keys, keys, "right") - lo
+        total = counts.sum()
+        if not total:
+            continue
+        i = np.repeat(np.arange(len(queries)), counts)
+        j = order[np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(total)]
+        # Filter per offset, so only one cell's worth of candidates is held.
+        close = _delta_e(full_queries[i], full_points[j]) <= r
+        found_i.append(i[close])
+        found_j.append(j[close])
+    if not found_i:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(found_i), np.concatenate(found_j)
+
+
+def _kdtree():
+    try:
+        from scipy.spatial import cKDTree
+    except ImportError:
+        return None
+    return cKDTree
+
+
+class ColorIndex:
+    """Spatial index over the colors of a catalog, in OKLab ×100."""
+
+    def __init__(self, names, rgb):
+        self.names = list(names)
+        self._basenames = [os.path.basename(name) for name in self.names]
+        self.lab = to_lab(rgb).reshape(-1, 2, 3)
+        kdtree = _kdtree()
+        self._tree = kdtree(self.lab.reshape(-1, 6)) if kdtree and len(self.names) else None
+
+    @classmethod
+    def from_catalog(cls, root, jobs=None):
+        return cls(*load_catalog(root, jobs))
+
+    # (i, j, ΔE) for query colors (lab, shape (n, 2, 3)) and index colors whose
+    # light and dark appearances are both within max_delta_e; with
+    # self_join, the index against itself, each pair once
+    def _matches(self, lab, max_delta_e, self_join=False):
+        if not len(self.names) or not len(lab):
+            i = j = np.empty(0, dtype=np.int64)
+        elif self._tree is not None:
+            # Both appearances within r means the 6-D distance is within r·√2.
+            radius = max_delta_e * np.sqrt(2)
+            if self_join:
+                pairs = self._tree.query_pairs(radius, output_type="ndarray")
+                i, j = pairs[:, 0], pairs[:, 1]
+            else:
+                pairs = type(self._tree)(lab.reshape(-1, 6)).sparse_distance_matrix(
+                    self._tree, radius, output_type="ndarray")
+                i, j = pairs["i"], pairs["j"]
+            i, j = i.astype(np.int64), j.astype(np.int64)
+        else:
+            i, j = _grid_pairs(self.lab, lab, max_delta_e)
+            if self_join:
+                i, j = i[i < j], j[i < j]
+        delta_e = _delta_e(lab[i], self.lab[j])
+        close = delta_e <= max_delta_e
+        return i[close], j[close], delta_e[close]
+
+    # Every pair of indexed colorsets within max_delta_e of each other:
+    # [(name, name, ΔE)], closest first
+    def pairs(self, max_delta_e=DEFAULT_MAX_DELTA_E):
+        i, j, delta_e = self._matches(self.lab, max_delta_e, self_join=True)
+        found = [(*sorted((self.names[a], self.names[b])), float(d))
+                 for a, b, d in zip(i.tolist(), j.tolist(), delta_e.tolist())]
+        return sorted(found, key=lambda pair: (pair[2], pair[0], pair[1]))
+
+    def clusters(self, max_delta_e=DEFAULT_MAX_DELTA_E):
+        """Near-duplicate clusters: [(center, [(name, ΔE to center), ...])].
+
+        Colors with the most matches become centers first and take their
+        still unclustered matches, so every member is within max_delta_e of
+        its center and each color is in at most one cluster. Largest first.
+        In a chain of grays where only neighbours match, the ends are never
+        grouped together:
+
+        >>> g = np.array([0.5, 0.515, 0.53, 0.545])[:, None, None] * np.ones((1, 2, 3))
+        >>> index = ColorIndex(["a", "b", "c", "d"], g)
+        >>> [(a, b, round(d, 2)) for a, b, d in index.pairs(2)]
+        [('c', 'd', 1.28), ('b', 'c', 1.28), ('a', 'b', 1.29)]
+        >>> [(center, [(m, round(d, 2)) for m, d in members])
+        ...  for center, members in index.clusters(2)]
+        [('b', [('c', 1.28), ('a', 1.29)])]
+        """
+        i, j, delta_e = self._matches(self.lab, max_delta_e, self_join=True)
+        neighbours = {}
+        for a, b, d in zip(i.tolist(), j.tolist(), delta_e.tolist()):
+            neighbours.setdefault(a, []).append((b, d))
+            neighbours.setdefault(b, []).append((a, d))
+        clustered = set()
+        clusters = []
+        for center in sorted(neighbours, key=lambda x: (-len(neighbours[x]), self.names[x])):
+            if center in clustered:
+                continue
+            members = [(x, d) for x, d in neighbours[center] if x not in clustered]
+            if not members:
+                continue
+            clustered.add(center)
+            clustered.update(x for x, _ in members)
+            clusters.append((self.names[center],
+                             sorted(((self.names[x], d) for x, d in members),
+                                    key=lambda member: (member[1], member[0]))))
+        return sorted(clusters, key=lambda cluster: (-len(cluster[1]), cluster[0]))
+
+    # Incoming colors (names and (n, 2, 3) sRGB) within max_delta_e of an
+    # indexed colorset with another name: [(name, existing name, ΔE)], closest
+    # first. A color matching its own name is being regenerated, not added.
+    def near_duplicates(self, names, rgb, max_delta_e=DEFAULT_MAX_DELTA_E):
+        names = list(names)
+        i, j, delta_e = self._matches(to_lab(rgb).reshape(-1, 2, 3), max_delta_e)
+        found = [(names[a], self.names[b], float(d))
+                 for a, b, d in zip(i.tolist(), j.tolist(), delta_e.tolist())
+                 if self._basenames[b] != names[a]]
+        return sorted(found, key=lambda match: (match[2], match[0], match[1]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Report near-identical colorsets in an asset catalog.")
+    parser.add_argument("catalog", help="asset catalog (or any folder) to scan")
+    parser.add_argument("--max-delta-e", type=float, default=DEFAULT_MAX_DELTA_E, metavar="DE",
+                        help="OKLab ΔE ×100 below which colors count as duplicates "
+                             "(default: %(default)s)")
+    parser.add_argument("--pairs", action="store_true",
+                        help="list every matching pair instead of clusters")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args(argv)
+
+    index = ColorIndex.from_catalog(args.catalog)
+    if args.pairs:
+        pairs = index.pairs(args.max_delta_e)
+        if args.json:
+            json.dump([{"a": a, "b": b, "delta_e": round(d, 3)} for a, b, d in pairs],
+                      sys.stdout, indent=2)
+            print()
+            return
+        print(f"🎨 {len(index.names)} colorsets, {len(pairs)} near-duplicate pairs "
+              f"(ΔE ≤ {args.max_delta_e:g})")
+        for a, b, delta_e in pairs:
+            print(f"  {a} ~ {b} (ΔE {delta_e:.2f})")
+        return
+
+    clusters = index.clusters(args.max_delta_e)
+    if args.json:
+        json.dump([{"center": center,
+                    "members": [{"name": name, "delta_e": round(d, 3)} for name, d in members]}
+                   for center, members in clusters], sys.stdout, indent=2)
+        print()
+        return
+    print(f"🎨 {len(index.names)} colorsets, {len(clusters)} near-duplicate clusters "
+          f"(ΔE ≤ {args.max_delta_e:g} from their center)")
+    for center, members in clusters:
+        print(f"  {center}: " + ", ".join(f"{name} ({d:.2f})" for name, d in members))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,13 @@
-import os
+import argparse
+import codecs
 import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from mcolors import check_color, color_components, colorset_contents, palette, write_if_changed
 
-# Helper function to convert hex to RGB components
-def hex_to_rgb(hex_code):
-    return {
-        "red": str(int(hex_code[0:2], 16) / 255),
-        "green": str(int(hex_code[2:4], 16) / 255),
-        "blue": str(int(hex_code[4:6], 16) / 255),
-        "alpha": "1.000"
-    }
-
-# Prompt the user for the list of colors
-print("🎨 Please enter your list of colors in JSON format.")
-print("   Each color should have a 'name', 'light', and 'dark' hex codes.")
-print("   Paste your JSON and enter 'END' on a new line when you're done.")
-print("   For example:")
-print("""
+EXAMPLE = """
 [
   {
     "name": "Bittersweet",
@@ -28,66 +20,176 @@ print("""
     "dark": "3A8A60"
   }
 ]
-""")
-
-# Read multi-line JSON input until 'END' is entered
-print("Enter your colors JSON (end with 'END'):")
-lines = []
-while True:
-    line = input()
-    if line.strip() == 'END':
-        break
-    lines.append(line)
-colors_input = '\n'.join(lines)
-
-# Parse the colors JSON
-try:
-    colors = json.loads(colors_input)
-except json.JSONDecodeError as e:
-    print("❌ Error parsing JSON:", e)
-    exit(1)
-
-# Prompt the user for the output directory
-output_dir = input("📂 Enter the directory to save the colorsets (default is current directory): ")
-if not output_dir:
-    output_dir = '.'
-
-# Generate colorset directories
-for color in colors:
-    folder_name = f"{color['name']}.colorset"
-    folder_path = os.path.join(output_dir, folder_name)
-    os.makedirs(folder_path, exist_ok=True)
-
-    contents = {
-        "info": {
-            "author": "xcode",
-            "version": 1
-        },
-        "colors": [
-            {
-                "color": {
-                    "color-space": "srgb",
-                    "components": hex_to_rgb(color["light"])
-                },
-                "idiom": "universal"
-            },
-            {
-                "appearances": [
-                    {
-                        "appearance": "luminosity",
-                        "value": "dark"
-                    }
-                ],
-                "color": {
-                    "color-space": "srgb",
-                    "components": hex_to_rgb(color["dark"])
-                },
-                "idiom": "universal"
-            }
-        ]
-    }
-
-    with open(os.path.join(folder_path, "Contents.json"), "w") as json_file:
-        json.dump(contents, json_file, indent=2)
-
-print("✅ Colorset files have been generated successfully!")
+"""
+
+# Index of the colorsets already in output_dir, to warn about near-duplicates
+# of them (None without NumPy)
+def existing_colors(output_dir):
+    if palette is None:
+        return None
+    from colorindex import ColorIndex
+    return ColorIndex.from_catalog(output_dir)
+
+# Warn about colors nearly identical to colorsets already in the index
+def warn_near_duplicates(index, colors, light, dark):
+    if index is None:
+        return
+    import numpy as np
+    from colorindex import DEFAULT_MAX_DELTA_E
+
+    matches = index.near_duplicates([color["name"] for color in colors],
+                                    np.stack([light, dark], axis=1) / 255)
+    for name, existing, delta_e in matches:
+        print(f"⚠️  {name} is nearly identical to {existing} (ΔE {delta_e:.2f} ≤ {DEFAULT_MAX_DELTA_E:g})",
+              file=sys.stderr)
+
+# Write the colorsets for a batch of colors, converted in one pass; files
+# whose content is unchanged are left alone. Returns how many were written.
+def write_colorsets(colors, output_dir, pool, index=None):
+    if palette is not None:
+        light, dark = palette.resolve(colors)
+        warn_near_duplicates(index, colors, light, dark)
+        components = list(zip(palette.components(light), palette.components(dark)))
+    else:
+        components = color_components(colors)
+
+    def write(items):
+        return sum(write_if_changed(os.path.join(output_dir, f"{color['name']}.colorset",
+                                                 "Contents.json"),
+                                    colorset_contents(light_components, dark_components))
+                   for color, (light_components, dark_components) in items)
+
+    items = list(zip(colors, components))
+    return sum(pool.map(write, [items[i:i + 256] for i in range(0, len(items), 256)]))
+
+# Colors parsed from a stream holding a JSON array of colors, or JSONL (any
+# whitespace-separated objects), yielded in batches: each batch is every
+# color complete in what has been read so far, so output starts with the
+# first chunk and memory stays bounded by the chunk size and largest entry.
+def iter_color_batches(f, chunk_size=1 << 16):
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    # read1() returns what a pipe has ready instead of waiting for a full chunk.
+    read = getattr(f, "read1", f.read)
+    buf, eof, in_array, done, n = "", False, None, False, 0
+    while True:
+        batch, pos = [], 0
+        while not done:
+            while pos < len(buf) and (buf[pos].isspace() or (in_array and buf[pos] == ",")):
+                pos += 1
+            if pos == len(buf):
+                break
+            if in_array is None:
+                in_array = buf[pos] == "["
+                if in_array:
+                    pos += 1
+                continue
+            if in_array and buf[pos] == "]":
+                done = True
+                pos += 1
+                break
+            try:
+                color, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                break  # the entry continues in the next chunk
+            n += 1
+            check_color(n, color)
+            batch.append(color)
+            pos = end
+        buf = buf[pos:]
+        if batch:
+            yield batch
+        if done or eof:
+            if buf.strip():
+                raise ValueError(f"unexpected data after the colors: {buf.strip()[:20]!r}")
+            if in_array and not done:
+                raise ValueError("unexpected end of input (missing ']')")
+            return
+        data = read(chunk_size)
+        eof = not data
+        buf += utf8.decode(data, final=eof)
+
+# Non-interactive mode: stream colors from input_path ("-" for stdin) into
+# output_dir, writing each batch as soon as it has been parsed
+def stream(input_path, output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    index = existing_colors(output_dir)
+    f = sys.stdin.buffer if input_path == "-" else open(input_path, "rb")
+    count = written = 0
+    try:
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as pool:
+            for batch in iter_color_batches(f):
+                written += write_colorsets(batch, output_dir, pool, index)
+                count += len(batch)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error after {count} colors:", e, file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if f is not sys.stdin.buffer:
+            f.close()
+    print(f"✅ {count} colorsets generated ({written} changed) in {output_dir}", file=sys.stderr)
+
+def interactive():
+    # Prompt the user for the list of colors
+    print("🎨 Please enter your list of colors in JSON format.")
+    print("   Each color should have a 'name', 'light', and 'dark' hex codes.")
+    print("   Leave out 'dark' to have a dark-mode variant derived from 'light'.")
+    print("   Paste your JSON and enter 'END' on a new line when you're done.")
+    print("   For example:")
+    print(EXAMPLE)
+
+    # Read multi-line JSON input until 'END' is entered
+    print("Enter your colors JSON (end with 'END'):")
+    lines = []
+    while True:
+        line = input()
+        if line.strip() == 'END':
+            break
+        lines.append(line)
+    colors_input = '\n'.join(lines)
+
+    # Parse the colors JSON
+    try:
+        colors = json.loads(colors_input)
+    except json.JSONDecodeError as e:
+        print("❌ Error parsing JSON:", e)
+        exit(1)
+
+    # Prompt the user for the output directory
+    output_dir = input("📂 Enter the directory to save the colorsets (default is current directory): ")
+    if not output_dir:
+        output_dir = '.'
+
+    # Generate colorset directories, converting the whole palette at once
+    try:
+        for n, color in enumerate(colors, 1):
+            check_color(n, color)
+        with ThreadPoolExecutor() as pool:
+            write_colorsets(colors, output_dir, pool, existing_colors(output_dir))
+    except (KeyError, ValueError) as e:
+        print("❌ Error in colors:", e)
+        exit(1)
+
+    print("✅ Colorset files have been generated successfully!")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate Xcode .colorset folders from a JSON list of colors. "
+                    "Without --output-dir, asks for the colors and directory interactively.")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="JSON array or JSONL of {name, light, dark?} colors "
+                             "(default: - for stdin)")
+    parser.add_argument("-o", "--output-dir",
+                        help="write the colorsets here, streaming them as the input is read")
+    args = parser.parse_args(argv)
+    if args.output_dir is None:
+        interactive()
+    else:
+        stream(args.input, args.output_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,16 @@
-import os
+import argparse
 import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import palette
+except ImportError:  # no NumPy: colors are converted one by one and need a "dark"
+    palette = None
 
 # Color definitions
 colors = [
@@ -19,12 +30,16 @@ def hex_to_rgb(hex_code):
         "alpha": "1.000"
     }
 
-# Generate colorset directories
-for color in colors:
-    folder_name = f"{color['name']}.colorset"
-    os.makedirs(folder_name, exist_ok=True)
+# Light and dark "components" for every color, derived dark variants included
+def color_components(colors):
+    if palette is not None:
+        light, dark = palette.resolve(colors)
+        return list(zip(palette.components(light), palette.components(dark)))
+    return [(hex_to_rgb(color["light"]), hex_to_rgb(color["dark"])) for color in colors]
 
-    contents = {
+# Contents.json structure for one color
+def _contents(light, dark):
+    return {
         "info": {
             "author": "xcode",
             "version": 1
@@ -33,7 +48,7 @@ for color in colors:
             {
                 "color": {
                     "color-space": "srgb",
-                    "components": hex_to_rgb(color["light"])
+                    "components": light
                 },
                 "idiom": "universal"
             },
@@ -46,12 +61,189 @@ for color in colors:
                 ],
                 "color": {
                     "color-space": "srgb",
-                    "components": hex_to_rgb(color["dark"])
+                    "components": dark
                 },
                 "idiom": "universal"
             }
         ]
     }
 
-    with open(os.path.join(folder_name, "Contents.json"), "w") as json_file:
-        json.dump(contents, json_file, indent=2)
+# The Contents.json text encoded once, with format fields where the components go
+_CONTENTS_TEMPLATE = re.sub(r'"@(\w+)\.(\w+)@"', r'"{\1[\2]}"', json.dumps(
+    _contents(*({key: f"@{side}.{key}@" for key in ("red", "green", "blue", "alpha")}
+                for side in ("light", "dark"))),
+    indent=2).replace("{", "{{").replace("}", "}}"))
+
+# Contents.json text for one color, byte for byte what json.dump(indent=2) writes
+def colorset_contents(light, dark):
+    return _CONTENTS_TEMPLATE.format(light=light, dark=dark)
+
+# Read a palette: a JSON array of colors, or JSONL with one color per line
+# ("-" for stdin); "dark" may be left out to have it derived (needs NumPy)
+def load_palette(path):
+    if path == "-":
+        text = sys.stdin.read()
+    else:
+        with open(path) as f:
+            text = f.read()
+    stripped = text.lstrip()
+    if stripped.startswith("["):
+        entries = json.loads(stripped)
+    else:
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+    for n, color in enumerate(entries, 1):
+        check_color(n, color)
+    return entries
+
+# Raise ValueError if palette entry n is not a usable color
+def check_color(n, color):
+    if not isinstance(color, dict) or not {"name", "light"} <= color.keys():
+        raise ValueError(f"color {n}: expected an object with a name and light color")
+    name = color["name"]
+    if not isinstance(name, str) or not name or name != os.path.basename(name) \
+            or name.startswith("."):
+        raise ValueError(f"color {n}: invalid name {name!r}")
+    if palette is None and not color.get("dark"):
+        raise ValueError(f"color {n}: no dark color (deriving one needs NumPy)")
+
+# Write text to path unless it already holds exactly that; the new file is
+# renamed into place, so Xcode never sees a half-written Contents.json.
+# Returns True if the file was written.
+def write_if_changed(path, text):
+    data = text.encode()
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".Contents.", suffix=".tmp", dir=folder)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return True
+
+# Names of the colorsets this script has written to output_dir, recorded in
+# a manifest there; only these are ever removed as stale.
+MANIFEST = ".mcolors-generated"
+
+def read_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST)) as f:
+            return {line.strip() for line in f if line.strip()}
+    except FileNotFoundError:
+        return set()
+
+def write_manifest(output_dir, names):
+    write_if_changed(os.path.join(output_dir, MANIFEST),
+                     "".join(f"{name}\n" for name in sorted(names)))
+
+# Colorsets listed in output_dir's manifest whose folder still holds nothing
+# but a Contents.json; a hand-made colorset, or one edited since (an extra
+# file in it), is never removed.
+def generated_colorsets(output_dir):
+    for name in read_manifest(output_dir):
+        path = os.path.join(output_dir, f"{name}.colorset")
+        if os.path.isdir(path) and not os.path.islink(path) \
+                and os.listdir(path) == ["Contents.json"]:
+            yield name
+
+# Bring output_dir in line with the colors: write only the Contents.json
+# files whose content changed (on a thread pool). With record, the names are
+# added to output_dir's manifest; with prune, colorsets from the manifest no
+# longer among the colors are removed.
+# Returns (written, unchanged, removed) counts.
+def sync_colorsets(colors, output_dir=".", jobs=None, prune=False, record=False):
+    # Later entries win when a name repeats.
+    targets = {color["name"]: colorset_contents(light, dark)
+               for color, (light, dark) in zip(colors, color_components(colors))}
+
+    def write(batch):
+        return sum(write_if_changed(os.path.join(output_dir, f"{name}.colorset", "Contents.json"),
+                                    text) for name, text in batch)
+
+    # Batches of files per task: most of them are unchanged, a read and compare.
+    items = list(targets.items())
+    batches = [items[i:i + 256] for i in range(0, len(items), 256)]
+    with ThreadPoolExecutor(max_workers=jobs or min(32, (os.cpu_count() or 1) * 4)) as pool:
+        written = sum(pool.map(write, batches))
+
+    removed = 0
+    if prune:
+        for name in list(generated_colorsets(output_dir)):
+            if name not in targets:
+                shutil.rmtree(os.path.join(output_dir, f"{name}.colorset"))
+                removed += 1
+    if record or prune:
+        # Names whose folder is gone or was removed drop out of the manifest.
+        recorded = set() if prune else {
+            name for name in read_manifest(output_dir)
+            if os.path.isdir(os.path.join(output_dir, f"{name}.colorset"))}
+        write_manifest(output_dir, recorded | targets.keys())
+    return written, len(targets) - written, removed
+
+# Colors within max_delta_e of a colorset already in catalog (under another
+# name): [(name, existing name, ΔE)]; see colorindex.py
+def near_duplicates(colors, catalog, max_delta_e):
+    import colorindex
+    import numpy as np
+
+    index = colorindex.ColorIndex.from_catalog(catalog)
+    light, dark = palette.resolve(colors)
+    rgb = np.stack([light, dark], axis=1) / 255
+    return index.near_duplicates([color["name"] for color in colors], rgb, max_delta_e)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate Xcode .colorset folders. Without --palette, writes the "
+                    "built-in colors to the current directory.")
+    parser.add_argument("--palette", metavar="FILE",
+                        help="JSON array or JSONL of {name, light, dark} colors, - for stdin; "
+                             "a missing dark is derived from light")
+    parser.add_argument("-o", "--output-dir", default=".",
+                        help="directory to write the colorsets to (default: .)")
+    parser.add_argument("-j", "--jobs", type=int, metavar="N",
+                        help="writer threads (default: 4 per core, at most 32)")
+    parser.add_argument("--prune", action="store_true",
+                        help="with --palette: remove colorsets an earlier run wrote that are "
+                             "no longer in it (listed in %s in the output dir)" % MANIFEST)
+    parser.add_argument("--max-delta-e", type=float, metavar="DE",
+                        help="with --palette: write nothing if a new color is within OKLab "
+                             "ΔE×100 DE of an existing colorset (e.g. 2; needs NumPy)")
+    parser.add_argument("--catalog", metavar="DIR",
+                        help="catalog to check --max-delta-e against (default: the output dir)")
+    args = parser.parse_args(argv)
+
+    if args.palette is None:
+        sync_colorsets(colors, args.output_dir, args.jobs)
+        return
+
+    try:
+        entries = load_palette(args.palette)
+        if args.max_delta_e is not None:
+            if palette is None:
+                raise ValueError("--max-delta-e needs NumPy")
+            matches = near_duplicates(entries, args.catalog or args.output_dir, args.max_delta_e)
+            if matches:
+                print(f"❌ {len(matches)} colors are near-duplicates of existing colorsets:")
+                for name, existing, delta_e in matches:
+                    print(f"   {name} ~ {existing} (ΔE {delta_e:.2f})")
+                sys.exit(1)
+        written, unchanged, removed = sync_colorsets(entries, args.output_dir, args.jobs,
+                                                     prune=args.prune, record=True)
+    except (OSError, ValueError) as e:
+        print("❌ Error in palette:", e)
+        sys.exit(1)
+    print(f"✅ {written} colorsets written, {unchanged} unchanged, {removed} stale removed")
+
+
+if __name__ == "__main__":
+    main()
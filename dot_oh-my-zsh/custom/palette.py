@@ -0,0 +1,185 @@
+"""
+Vectorized palette engine for the colorset scripts.
+
+Whole palettes are handled as NumPy arrays: hex codes are parsed in one
+pass, converted to OKLab/OKLCH, and missing dark-mode variants are derived
+there, since equal steps in OKLab look equal. A derived dark color keeps
+the light color's hue, with its lightness and chroma scaled down like the
+hand-picked pairs in mcolors.py (EE6352 -> C24B42 and so on), then raised
+again where needed to keep MIN_CONTRAST against the dark background, and
+finally pulled back into the sRGB gamut by reducing chroma.
+"""
+
+import numpy as np
+
+# Dark variants: lightness and chroma relative to the light color, and the
+# WCAG contrast they must keep against the dark-mode background.
+DARK_LIGHTNESS = 0.82
+DARK_CHROMA = 0.86
+DARK_BACKGROUND = "1C1C1E"
+MIN_CONTRAST = 3.0
+
+# Bisection steps for the contrast and gamut searches (2^-20 is far below
+# one 8-bit step), and contrast headroom so rounding to 8 bits cannot drop a
+# color below MIN_CONTRAST.
+_STEPS = 20
+_CONTRAST_MARGIN = 0.05
+
+_LMS_FROM_LINEAR = np.array([
+    [0.4122214708, 0.5363325363, 0.0514459929],
+    [0.2119034982, 0.6806995451, 0.1073969566],
+    [0.0883024619, 0.2817188376, 0.6299787005],
+])
+_OKLAB_FROM_LMS = np.array([
+    [0.2104542553, 0.7936177850, -0.0040720468],
+    [1.9779984951, -2.4285922050, 0.4505937099],
+    [0.0259040371, 0.7827717662, -0.8086757660],
+])
+_LINEAR_FROM_LMS = np.linalg.inv(_LMS_FROM_LINEAR)
+_LMS_FROM_OKLAB = np.linalg.inv(_OKLAB_FROM_LMS)
+_LUMINANCE = np.array([0.2126, 0.7152, 0.0722])
+
+# ASCII -> nibble value (255 for anything that is not a hex digit), and back.
+_NIBBLES = np.full(256, 255, dtype=np.uint8)
+for _i, _c in enumerate(b"0123456789abcdef"):
+    _NIBBLES[_c] = _i
+    _NIBBLES[bytes([_c]).upper()[0]] = _i
+_HEX_DIGITS = np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)
+
+# The component strings Xcode colorsets get, str(value / 255), one per byte value.
+_COMPONENTS = np.array([str(i / 255) for i in range(256)], dtype=object)
+
+
+# (n, 3) uint8 array from hex codes like "EE6352" or "#ee6352"
+def parse_hex(codes):
+    codes = [code.lstrip("#") if isinstance(code, str) else "" for code in codes]
+    lengths = np.fromiter(map(len, codes), dtype=np.int64, count=len(codes))
+    bad = np.flatnonzero(lengths != 6)
+    if not bad.size:
+        try:
+            ascii_codes = "".join(codes).encode("ascii")
+        except UnicodeEncodeError:
+            ascii_codes = None
+        if ascii_codes is not None:
+            nibbles = _NIBBLES[np.frombuffer(ascii_codes, dtype=np.uint8)].reshape(-1, 3, 2)
+            bad = np.flatnonzero((nibbles == 255).any(axis=(1, 2)))
+            if not bad.size:
+                return nibbles[:, :, 0] << 4 | nibbles[:, :, 1]
+        else:
+            bad = [next(i for i, code in enumerate(codes) if not code.isascii())]
+    raise ValueError(f"invalid hex color {codes[bad[0]]!r} (entry {bad[0] + 1})")
+
+
+# Hex codes ("EE6352") for an (n, 3) uint8 array
+def to_hex(rgb):
+    rgb = np.asarray(rgb, dtype=np.uint8)
+    digits = np.empty((len(rgb), 3, 2), dtype=np.uint8)
+    digits[:, :, 0] = _HEX_DIGITS[rgb >> 4]
+    digits[:, :, 1] = _HEX_DIGITS[rgb & 15]
+    return digits.reshape(-1, 6).view("S6").ravel().astype(str).tolist()
+
+
+# Colorset "components" dicts for an (n, 3) uint8 array, the same strings
+# hex_to_rgb() in the scripts produces
+def components(rgb):
+    return [{"red": r, "green": g, "blue": b, "alpha": "1.000"}
+            for r, g, b in _COMPONENTS[np.asarray(rgb, dtype=np.uint8)].tolist()]
+
+
+def srgb_to_linear(srgb):
+    return np.where(srgb <= 0.04045, srgb / 12.92, ((srgb + 0.055) / 1.055) ** 2.4)
+
+
+def linear_to_srgb(linear):
+    linear = np.clip(linear, 0.0, 1.0)
+    return np.where(linear <= 0.0031308, linear * 12.92,
+                    1.055 * linear ** (1 / 2.4) - 0.055)
+
+
+def linear_to_oklab(linear):
+    return np.cbrt(linear @ _LMS_FROM_LINEAR.T) @ _OKLAB_FROM_LMS.T
+
+
+def oklab_to_linear(lab):
+    return (lab @ _LMS_FROM_OKLAB.T) ** 3 @ _LINEAR_FROM_LMS.T
+
+
+def oklab_to_oklch(lab):
+    L, a, b = np.moveaxis(lab, -1, 0)
+    return np.stack([L, np.hypot(a, b), np.arctan2(b, a)], axis=-1)
+
+
+def oklch_to_oklab(lch):
+    L, C, h = np.moveaxis(lch, -1, 0)
+    return np.stack([L, C * np.cos(h), C * np.sin(h)], axis=-1)
+
+
+# WCAG relative luminance of linear sRGB colors, and the contrast ratio of two
+def luminance(linear):
+    return linear @ _LUMINANCE
+
+
+def contrast_ratio(lum_a, lum_b):
+    hi, lo = np.maximum(lum_a, lum_b), np.minimum(lum_a, lum_b)
+    return (hi + 0.05) / (lo + 0.05)
+
+
+# Linear sRGB for OKLCH colors, reducing chroma (hue and lightness kept)
+# where the color falls outside the sRGB gamut
+def _gamut_map(L, C, h):
+    def linear(scale):
+        return oklab_to_linear(oklch_to_oklab(np.stack([L, C * scale, h], axis=-1)))
+
+    def inside(rgb):
+        return ((rgb >= -1e-6) & (rgb <= 1 + 1e-6)).all(axis=-1)
+
+    rgb = linear(1.0)
+    out = np.flatnonzero(~inside(rgb))
+    if out.size:
+        L, C, h = L[out], C[out], h[out]
+        lo, hi = np.zeros_like(L), np.ones_like(L)
+        for _ in range(_STEPS):
+            mid = (lo + hi) / 2
+            ok = inside(linear(mid))
+            lo, hi = np.where(ok, mid, lo), np.where(ok, hi, mid)
+        rgb[out] = linear(lo)
+    return np.clip(rgb, 0.0, 1.0)
+
+
+# Dark-mode variants of an (n, 3) uint8 array of light colors
+def derive_dark(light, background=DARK_BACKGROUND, min_contrast=MIN_CONTRAST):
+    L, C, h = oklab_to_oklch(linear_to_oklab(srgb_to_linear(light / 255))).T
+    target, C = L * DARK_LIGHTNESS, C * DARK_CHROMA
+    bg = luminance(srgb_to_linear(parse_hex([background])[0] / 255))
+    goal = min_contrast + _CONTRAST_MARGIN
+
+    def contrast(lightness, rows):
+        return contrast_ratio(luminance(_gamut_map(lightness, C[rows], h[rows])), bg)
+
+    # Where the scaled color is too dim, find the least lightness that keeps
+    # the contrast target (contrast grows with lightness against a dark
+    # background).
+    short = np.flatnonzero(contrast(target, slice(None)) < goal)
+    if short.size:
+        lo, hi = target[short], np.ones(short.size)
+        for _ in range(_STEPS):
+            mid = (lo + hi) / 2
+            ok = contrast(mid, short) >= goal
+            lo, hi = np.where(ok, lo, mid), np.where(ok, mid, hi)
+        target[short] = hi
+
+    srgb = linear_to_srgb(_gamut_map(target, C, h))
+    return np.rint(srgb * 255).astype(np.uint8)
+
+
+# (light, dark) uint8 arrays for a palette of {"light": hex, "dark"?: hex}
+# dicts; colors without a "dark" get derive_dark()'s variant
+def resolve(palette, background=DARK_BACKGROUND, min_contrast=MIN_CONTRAST):
+    light = parse_hex([color["light"] for color in palette])
+    missing = np.array([not color.get("dark") for color in palette], dtype=bool)
+    dark = np.empty_like(light)
+    if (~missing).any():
+        dark[~missing] = parse_hex([color["dark"] for color in palette if color.get("dark")])
+    if missing.any():
+        dark[missing] = derive_dark(light[missing], background, min_contrast)
+    return light, dark